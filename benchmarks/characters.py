@@ -0,0 +1,364 @@
+"""
+Offline benchmark of building characters from the wiki pages in benchmarks/fixtures.
+
+The fixtures follow the markup of the live pages: fandom site chrome with paragraphs outside .mw-parser-output, and
+infobox boxes holding a single value (Fors Wall's Titles, Species and Height) as well as <li> lists. They are built by
+hand, so --record replaces them with the live pages when the wiki can be reached.
+
+Measures the fetch-free construction of a Character, each of its extractors, format_name, serialization, the memory
+held per Character (also in low-memory mode) and per CharacterRecord, and the throughput of mystic.iter_characters at
+several worker counts against a local server of the fixtures. Prints the results as JSON, which can be saved with
+--output and compared with --compare.
+
+Usage:
+    python benchmarks/characters.py [--runs N] [--workers 1 2 4 8] [--pages N] [--output FILE] [--compare FILE]
+    python benchmarks/characters.py --record "Klein Moretti" "Audrey Hall"
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+import mystic  # noqa: E402
+from mystic.helpers.misc import format_name  # noqa: E402
+
+NAMES = [
+    "Klein Moretti",
+    "fors wall",
+    "the fool that doesn't belong to this era",
+    "Lord of the Mysteries",
+    "Amon",
+]
+
+
+def load_fixtures(directory: str = FIXTURES) -> dict:
+    """
+    Reads the saved pages.
+
+    Parameters:
+    directory (str): The directory of the pages, named after their URL names.
+
+    Returns:
+    dict: The HTML of each page, by URL name.
+    """
+    pages = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".html"):
+            with open(os.path.join(directory, filename), "rb") as file:
+                pages[filename[:-5]] = file.read()
+    return pages
+
+
+def record(names, directory: str = FIXTURES):
+    """
+    Saves the live pages of characters as fixtures.
+
+    Parameters:
+    names (Iterable[str]): The names of the characters.
+    directory (str): The directory to save the pages to.
+    """
+    client = mystic.Client()
+    for name in names:
+        url_name = format_name(name)
+        response = client.get(client.base_url + url_name)
+        response.raise_for_status()
+        with open(os.path.join(directory, url_name + ".html"), "wb") as file:
+            file.write(response.content)
+        print(f"Saved {url_name} ({len(response.content) // 1024} KiB)")
+
+
+def response(body: bytes) -> requests.Response:
+    """Wraps a saved page into a response, as returned by the client."""
+    result = requests.Response()
+    result.status_code = 200
+    result.encoding = "utf-8"
+    result._content = body
+    return result
+
+
+def timeit(function, runs: int) -> float:
+    """Returns the median wall time of a function in microseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def measure_construction(pages: dict, runs: int) -> dict:
+    """
+    Times the fetch-free construction of a Character from each page: parsing, infobox indexing and name.
+
+    Returns:
+    dict: The median time in milliseconds, by page.
+    """
+    return {
+        url_name: timeit(
+            lambda: mystic.Character(url_name, response=response(body)), runs
+        )
+        / 1000
+        for url_name, body in pages.items()
+    }
+
+
+def measure_extractors(pages: dict, runs: int) -> dict:
+    """
+    Times each get_* extractor of Character on already parsed pages.
+
+    Returns:
+    dict: The median time in microseconds of each field, summed over the pages.
+    """
+    characters = [
+        mystic.Character(url_name, response=response(body))
+        for url_name, body in pages.items()
+    ]
+    results = {}
+    for field in ("name",) + mystic.Character.fields:
+        getter = "get_name" if field == "name" else vars(mystic.Character)[field].getter
+        total = 0.0
+        for character in characters:
+            method = getattr(character, getter)
+            try:
+                method()
+            except Exception:
+                # The page lacks the field and the getter does not handle it
+                continue
+            total += timeit(method, runs)
+        results[field] = total
+    return results
+
+
+def measure_format_name(runs: int) -> dict:
+    """
+    Times format_name, with its cache cold and warm.
+
+    Returns:
+    dict: The median time in microseconds of formatting every name of NAMES.
+    """
+
+    def cold():
+        format_name.cache_clear()
+        for name in NAMES:
+            format_name(name)
+
+    def warm():
+        for name in NAMES:
+            format_name(name)
+
+    return {"cold": timeit(cold, runs), "warm": timeit(warm, runs)}
+
+
+def measure_serialization(pages: dict, runs: int) -> dict:
+    """
+    Times encoding fully loaded characters and rebuilding them without any fetch or parse.
+
+    Returns:
+    dict: The median time in microseconds to encode and to decode every page, and the encoded size, by format.
+    """
+    characters = []
+    for url_name, body in pages.items():
+        character = mystic.Character(url_name, response=response(body))
+        character.load_fields()
+        characters.append(character)
+
+    results = {}
+    for format in mystic.helpers.serial.FORMATS:
+        try:
+            payload = mystic.encode_many(characters, format)
+        except ImportError:
+            continue
+        results[format] = {
+            "encode": timeit(lambda: mystic.encode_many(characters, format), runs),
+            "decode": timeit(lambda: list(mystic.decode_many(payload, format)), runs),
+            "bytes": len(payload),
+        }
+    return results
+
+
+def measure_memory(pages: dict, count: int = 30) -> dict:
+    """
+    Measures the memory held by fully loaded characters, in normal and low-memory mode, and by their records,
+    with the peak while building them.
+
+    Returns:
+    dict: The retained memory in KiB per object, and the peak memory in KiB, of each kind of object.
+    """
+    bodies = list(pages.items())
+
+    def character(number):
+        url_name, body = bodies[number % len(bodies)]
+        character = mystic.Character(url_name, response=response(body))
+        character.load_fields()
+        return character
+
+    builders = {
+        "character": character,
+        "low_memory": character,
+        "record": lambda number: character(number).to_record(),
+    }
+    results = {}
+    for kind, build in builders.items():
+        mystic.Character.low_memory = kind == "low_memory"
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        kept = [build(number) for number in range(count)]
+        # Parsed trees are cyclic, so they are only freed by the garbage collector
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[kind] = {
+            "retained_kb_per_object": (current - before) / 1024 / len(kept),
+            "peak_kb": (peak - before) / 1024,
+        }
+    mystic.Character.low_memory = False
+    return results
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the fixtures at /wiki/<URL name>, ignoring a numeric suffix so every copy is a distinct page."""
+
+    pages = {}
+
+    def do_GET(self):
+        url_name = re.sub(r"_\d+$", "", self.path.rsplit("/", 1)[-1])
+        body = self.pages.get(url_name)
+        self.send_response(200 if body is not None else 404)
+        body = body if body is not None else b"Not Found"
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def measure_throughput(pages: dict, workers, count: int) -> dict:
+    """
+    Loads characters end to end with mystic.iter_characters from a local server of the fixtures.
+
+    Returns:
+    dict: The characters per second, by number of workers.
+    """
+    handler = type("Handler", (FixtureHandler,), {"pages": pages})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/wiki/"
+
+    url_names = list(pages)
+    names = [
+        url_names[n % len(url_names)].replace("_", " ") + f" {n}" for n in range(count)
+    ]
+    results = {}
+    try:
+        for worker_count in workers:
+            client = mystic.Client(base_url=base_url, pool_size=worker_count)
+            start = time.perf_counter()
+            loaded = sum(
+                1
+                for _ in mystic.iter_characters(
+                    names, workers=worker_count, client=client
+                )
+            )
+            results[str(worker_count)] = loaded / (time.perf_counter() - start)
+            client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def revision() -> str:
+    """Returns the git commit being measured, or None outside of a checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> dict:
+    """
+    Divides every measurement by the same measurement of a baseline.
+
+    Returns:
+    dict: The ratios, with the same nesting as the results.
+    """
+    ratios = {}
+    for key, value in results.items():
+        other = baseline.get(key)
+        if isinstance(value, dict) and isinstance(other, dict):
+            ratios[key] = compare(value, other)
+        elif isinstance(value, (int, float)) and isinstance(other, (int, float)):
+            ratios[key] = value / other if other else None
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--output", help="Also write the results to this file.")
+    parser.add_argument(
+        "--compare", help="Report the ratios to the results in this file."
+    )
+    parser.add_argument(
+        "--record", nargs="+", metavar="NAME", help="Save live pages as fixtures."
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+
+    pages = load_fixtures()
+    results = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "parser": mystic.Character.parser,
+        "fixtures_kb": {
+            url_name: len(body) // 1024 for url_name, body in pages.items()
+        },
+        "construction_ms": measure_construction(pages, args.runs),
+        "extractors_us": measure_extractors(pages, args.runs),
+        "format_name_us": measure_format_name(args.runs),
+        "serialization_us": measure_serialization(pages, args.runs),
+        "memory": measure_memory(pages),
+        "throughput_per_second": measure_throughput(pages, args.workers, args.pages),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            results["ratios"] = compare(results, json.load(file))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
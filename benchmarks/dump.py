@@ -0,0 +1,112 @@
+"""
+Benchmark of the offline ingestion of an XML dump.
+
+Writes a fixture dump of synthetic character pages, streams it through mystic.iter_dump and reports the throughput
+and the peak memory, which should stay flat whatever the number of pages. Prints the results as JSON.
+
+Usage:
+    python benchmarks/dump.py [--pages N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE = """<page><title>{title}</title><ns>0</ns><id>{id}</id>
+<revision><id>{id}</id><timestamp>2026-01-01T00:00:00Z</timestamp><text xml:space="preserve">{text}</text></revision>
+</page>
+"""
+
+TEXT = """{{{{Character
+|name = {title}
+|image = {title}.jpg
+|chinese = 克莱恩·莫雷蒂<br>{title}
+|birth = March 4th, 1327<ref>Volume 1</ref>
+|gender = [[Male]]
+|species = *[[Mythical Creature]]<br>*Human (Former)
+|aliases = *[[The Fool]] (愚者)<br>*[[Gehrman Sparrow]]<br>*[[Sherlock Moriarty]]
+|pathway = [[Fool Pathway|Fool]]
+|relatives = *Benson Moretti (Elder Brother)<br>*Melissa Moretti (Younger Sister)
+|affiliation = *[[Tarot Club]]<br>*[[Nighthawks]] (Former)
+}}}}
+<poem>The Fool that doesn't belong to this era</poem>
+
+'''{title}''' is a character of [[Lord of the Mysteries]].{filler}
+
+He lives in [[Tingen]].
+
+== History ==
+{filler}
+"""
+
+
+def write_dump(path: str, pages: int):
+    """
+    Writes a fixture dump of synthetic character pages.
+
+    Parameters:
+    path (str): The path of the dump.
+    pages (int): The number of pages.
+    """
+    filler = " Lorem ipsum dolor sit amet." * 40
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">\n')
+        for number in range(pages):
+            title = f"Character {number}"
+            text = TEXT.format(title=title, filler=filler)
+            file.write(PAGE.format(title=title, id=number, text=escape(text)))
+        file.write("</mediawiki>\n")
+
+
+def measure(path: str) -> dict:
+    """
+    Streams a dump through mystic.iter_dump.
+
+    Parameters:
+    path (str): The path of the dump.
+
+    Returns:
+    dict: The number of characters, the throughput and the peak memory.
+    """
+    sys.path.insert(0, ROOT)
+    import mystic
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = sum(1 for _ in mystic.iter_dump(path))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "characters": count,
+        "seconds": elapsed,
+        "characters_per_second": count / elapsed,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for pages in args.pages:
+            path = os.path.join(directory, f"dump-{pages}.xml")
+            write_dump(path, pages)
+            results[str(pages)] = {"dump_mb": os.path.getsize(path) / 2**20}
+            results[str(pages)].update(measure(path))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test of the HTTP JSON service of `python -m mystic serve`.
+
+Sends requests for a set of names from many threads for a fixed time, then reports the throughput, the latency
+percentiles and the statuses, along with the /stats of the server. Without --url, a server is started in-process
+against a local wiki serving the fixtures of benchmarks/fixtures, so the test runs offline. Prints the results as JSON.
+
+Usage:
+    python benchmarks/loadtest.py [--url http://127.0.0.1:8000] [--names A B ...] [--threads N] [--seconds S]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+import mystic  # noqa: E402
+from characters import FixtureHandler, load_fixtures  # noqa: E402
+
+
+def start_local() -> tuple:
+    """
+    Starts a local wiki of the fixtures and a CharacterServer in front of it.
+
+    Returns:
+    tuple: The URL of the server, the names of the fixtures and a function stopping both servers.
+    """
+    from mystic.objects.server import CharacterServer
+
+    pages = load_fixtures()
+    handler = type("Handler", (FixtureHandler,), {"pages": pages})
+    wiki = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=wiki.serve_forever, daemon=True).start()
+
+    client = mystic.Client(base_url=f"http://127.0.0.1:{wiki.server_address[1]}/wiki/")
+    server = CharacterServer(("127.0.0.1", 0), client)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        wiki.shutdown()
+
+    names = [url_name.replace("_", " ") for url_name in pages]
+    return f"http://127.0.0.1:{server.server_address[1]}", names, stop
+
+
+def worker(url: str, names: list, deadline: float, results: list):
+    """Sends requests in a loop until the deadline, recording (status, seconds) pairs."""
+    session = requests.Session()
+    number = 0
+    while time.perf_counter() < deadline:
+        name = names[number % len(names)]
+        number += 1
+        start = time.perf_counter()
+        try:
+            status = session.get(f"{url}/characters/{quote(name)}").status_code
+        except requests.RequestException:
+            status = None
+        results.append((status, time.perf_counter() - start))
+
+
+def run(url: str, names: list, threads: int, seconds: float) -> dict:
+    """
+    Loads the server from many threads.
+
+    Returns:
+    dict: The throughput, the latency percentiles in milliseconds and the count of each status.
+    """
+    results = []
+    deadline = time.perf_counter() + seconds
+    pool = [
+        threading.Thread(target=worker, args=(url, names, deadline, results))
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds for _, seconds in results)
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(results),
+        "requests_per_second": len(results) / elapsed,
+        "latency_ms": {
+            "p50": latencies[int(len(latencies) * 0.50)] * 1000,
+            "p90": latencies[int(len(latencies) * 0.90)] * 1000,
+            "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+            "max": latencies[-1] * 1000,
+        },
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--url", help="The server to load. Starts a local one if omitted."
+    )
+    parser.add_argument("--names", nargs="+", help="The names to request.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    stop = None
+    url, names = args.url, args.names
+    if url is None:
+        url, fixtures, stop = start_local()
+        names = names or fixtures
+    if not names:
+        parser.error("--names is required with --url.")
+
+    try:
+        results = run(url.rstrip("/"), names, args.threads, args.seconds)
+        results["server"] = requests.get(f"{url.rstrip('/')}/stats").json()
+    finally:
+        if stop is not None:
+            stop()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
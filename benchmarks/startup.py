@@ -0,0 +1,87 @@
+"""
+Startup-time benchmark of the API.
+
+Measures, in fresh interpreters, how long `import mystic` takes and how long it takes until `mystic.Character` is usable,
+as well as the cost of formatting names. Prints the results as JSON.
+
+Usage:
+    python benchmarks/startup.py [--runs N]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    "interpreter": "pass",
+    "import_mystic": "import mystic",
+    "import_character": "import mystic; mystic.Character",
+}
+
+
+def time_snippet(code: str, runs: int) -> dict:
+    """
+    Times a snippet of code in fresh interpreters.
+
+    Parameters:
+    code (str): The code to run.
+    runs (int): The number of interpreters to start.
+
+    Returns:
+    dict: The median and minimum wall time in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings)}
+
+
+def time_format_name(calls: int = 10000) -> dict:
+    """
+    Times the formatting of names, both on first sight and once memoized.
+
+    Parameters:
+    calls (int): The number of names to format.
+
+    Returns:
+    dict: The mean time per call in microseconds.
+    """
+    sys.path.insert(0, ROOT)
+    from mystic.helpers.misc import format_name
+
+    names = [f"klein moretti of the tarot club {i}" for i in range(calls)]
+    format_name.cache_clear()
+
+    start = time.perf_counter()
+    for name in names:
+        format_name(name)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in names:
+        format_name(name)
+    warm = time.perf_counter() - start
+
+    return {"cold_us": cold / calls * 1e6, "memoized_us": warm / calls * 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {name: time_snippet(code, args.runs) for name, code in SNIPPETS.items()}
+    results["format_name"] = time_format_name()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
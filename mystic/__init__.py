@@ -2,6 +2,49 @@
 Author: Jaguar000212 & Theroid00
 Description: This is a library that scraps data from one of the fandoms of Lord of the Mysteries, the renounced Novel.
 Data is scraped from https://lordofthemysteries.fandom.com/wiki/Lord_of_Mysteries_Wiki.
+
+The public objects are imported on first access, so that `import mystic` stays cheap.
 """
 
-from mystic.objects.character import Character
+import importlib
+
+_EXPORTS = {
+    "Character": "mystic.objects.character",
+    "LoadError": "mystic.objects.character",
+    "afetch_many": "mystic.objects.character",
+    "fetch_batch": "mystic.objects.character",
+    "iter_characters": "mystic.objects.character",
+    "encode_many": "mystic.objects.character",
+    "decode_many": "mystic.objects.character",
+    "iter_dump": "mystic.objects.dump",
+    "Store": "mystic.objects.store",
+    "SearchIndex": "mystic.objects.search",
+    "RelationGraph": "mystic.objects.graph",
+    "Crawler": "mystic.objects.crawler",
+    "CharacterRecord": "mystic.objects.record",
+    "refresh": "mystic.objects.refresh",
+    "CharacterServer": "mystic.objects.server",
+    "export": "mystic.objects.export",
+    "Client": "mystic.helpers.client",
+    "AsyncClient": "mystic.helpers.client",
+    "PageCache": "mystic.helpers.cache",
+    "RateLimiter": "mystic.helpers.ratelimit",
+}
+
+_SUBPACKAGES = ("helpers", "objects", "objectStructures")
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
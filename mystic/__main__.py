@@ -0,0 +1,170 @@
+"""
+Command-line entry point of the API.
+
+Usage:
+    python -m mystic serve [--port 8000] [--snapshot characters.jsonl] [--cache-size N] [--ttl SECONDS]
+    python -m mystic export --names names.txt [--workers N] [--format jsonl|csv] [--output FILE] [--failures FILE]
+"""
+
+import argparse
+import contextlib
+import sys
+
+import mystic.helpers as helpers
+
+
+def add_client_arguments(parser: argparse.ArgumentParser):
+    """
+    Adds the options of the HTTP client to a command.
+
+    Parameters:
+    parser (ArgumentParser): The parser of the command.
+    """
+    group = parser.add_argument_group("wiki client")
+    group.add_argument(
+        "--base-url", default=None, help="The wiki URL page names are appended to."
+    )
+    group.add_argument(
+        "--pool-size", type=int, default=helpers.client.DEFAULT_POOL_SIZE
+    )
+    group.add_argument(
+        "--page-cache", metavar="DIRECTORY", help="Keep fetched pages on disk."
+    )
+    group.add_argument(
+        "--rate", type=float, help="The maximum requests per second to the wiki."
+    )
+    group.add_argument("--burst", type=int, default=10)
+    group.add_argument("--retries", type=int, default=helpers.client.DEFAULT_RETRIES)
+
+
+def make_client(args) -> helpers.client.Client:
+    """
+    Builds the HTTP client described by the options of add_client_arguments.
+
+    Parameters:
+    args (Namespace): The parsed options.
+
+    Returns:
+    Client: The client.
+    """
+    return helpers.client.Client(
+        pool_size=args.pool_size,
+        base_url=args.base_url or helpers.client.WEB_URL,
+        cache=helpers.cache.PageCache(args.page_cache) if args.page_cache else None,
+        rate_limiter=(
+            helpers.ratelimit.RateLimiter(args.rate, args.burst) if args.rate else None
+        ),
+        retries=args.retries,
+    )
+
+
+def serve(args):
+    """Runs the HTTP JSON service."""
+    from mystic.objects.server import serve
+
+    with make_client(args) as client:
+        serve(
+            args.host,
+            args.port,
+            client,
+            cache_size=args.cache_size,
+            ttl=args.ttl or None,
+            snapshot=args.snapshot,
+        )
+
+
+def export(args) -> int:
+    """Exports the characters named in a file, returning 1 if any failed."""
+    from mystic.objects.export import export, read_names
+
+    with contextlib.ExitStack() as files:
+        client = files.enter_context(make_client(args))
+        names = (
+            sys.stdin
+            if args.names == "-"
+            else files.enter_context(open(args.names, encoding="utf-8"))
+        )
+        output = (
+            files.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+            if args.output
+            else sys.stdout
+        )
+        failures = (
+            files.enter_context(open(args.failures, "w", encoding="utf-8"))
+            if args.failures
+            else None
+        )
+        result = export(
+            read_names(names),
+            output,
+            format=args.format,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            client=client,
+            failures=failures,
+            progress=None if args.quiet else sys.stderr,
+        )
+    return 1 if result.failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mystic", description=__doc__.splitlines()[1]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("serve", help="Serve characters as JSON over HTTP.")
+    command.add_argument("--host", default="127.0.0.1")
+    command.add_argument("--port", type=int, default=8000)
+    command.add_argument(
+        "--cache-size",
+        type=int,
+        default=4096,
+        help="The most characters kept in memory.",
+    )
+    command.add_argument(
+        "--ttl",
+        type=float,
+        default=3600,
+        help="Seconds a character stays cached, 0 for ever.",
+    )
+    command.add_argument(
+        "--snapshot",
+        help="A JSON Lines (or .msgpack) file of characters preloaded on start and saved on exit.",
+    )
+    add_client_arguments(command)
+    command.set_defaults(run=serve)
+
+    command = commands.add_parser(
+        "export", help="Export characters as JSON Lines or CSV."
+    )
+    command.add_argument(
+        "--names",
+        required=True,
+        help="A file of names, one per line, or - for standard input.",
+    )
+    command.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    command.add_argument(
+        "--output", help="The file to write to. Defaults to standard output."
+    )
+    command.add_argument(
+        "--failures", help="A file to log the names that failed to, with their error."
+    )
+    command.add_argument("--workers", type=int, default=8)
+    command.add_argument(
+        "--max-in-flight",
+        type=int,
+        help="The most characters loaded or buffered at once. Defaults to twice the workers.",
+    )
+    command.add_argument(
+        "--quiet", action="store_true", help="Do not report the progress."
+    )
+    add_client_arguments(command)
+    command.set_defaults(run=export)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,18 @@
 """Register all helper functions here to be used in the API."""
 
+import importlib
+
 import mystic.helpers.exceptions as exceptions
 import mystic.helpers.misc as misc
+import mystic.helpers.memo as memo
+import mystic.helpers.ratelimit as ratelimit
+import mystic.helpers.serial as serial
+
+# Imported on first access, as they pull in requests
+_LAZY_MODULES = ("api", "cache", "client")
+
+
+def __getattr__(name):
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,196 @@
+"""Access to the MediaWiki API (api.php) of the wiki."""
+
+from collections import namedtuple
+from urllib.parse import urlencode, urljoin
+
+from mystic.helpers.client import get_client
+from mystic.helpers.exceptions import NotFoundError, TransportError
+from mystic.helpers.misc import format_name
+
+# The most titles MediaWiki accepts in one query for regular users
+MAX_TITLES = 50
+
+Page = namedtuple("Page", ["title", "pageid", "revid", "timestamp"])
+Page.__doc__ = "A page of the wiki, as resolved by the API, with its latest revision."
+
+
+class WikiAPI:
+    """Sends batched queries to the MediaWiki API of the wiki."""
+
+    def __init__(self, client=None, api_url: str = None):
+        """
+        Initializes a WikiAPI object.
+
+        Parameters:
+        - client (Client): The HTTP client to send the queries with. Defaults to the shared client.
+        - api_url (str): The URL of api.php. Defaults to the one next to the wiki URL of the client.
+        """
+        self.client = client or get_client()
+        self.api_url = api_url or urljoin(self.client.base_url, "../api.php")
+
+    def query(self, **params) -> dict:
+        """
+        Sends a query to the API.
+
+        Parameters:
+        - **params: The parameters of the query, e.g. titles="A|B".
+
+        Returns:
+        - dict: The decoded JSON answer of the API.
+
+        Raises:
+        - NotFoundError: If there is no API at api_url.
+        - TransportError: If the API cannot be reached or answers with another error.
+        """
+        params = {"action": "query", "format": "json", "formatversion": "2", **params}
+        # The parameters are part of the URL so that cached answers are keyed by them
+        response = self.client.get(f"{self.api_url}?{urlencode(params)}")
+        if response.status_code in (404, 410):
+            raise NotFoundError(f"{self.api_url} not found.")
+        if response.status_code != 200:
+            raise TransportError(
+                f"{self.api_url} answered {response.status_code}.",
+                response.status_code,
+            )
+        return response.json()
+
+    def resolve(self, names, batch_size: int = MAX_TITLES, exact: bool = False) -> dict:
+        """
+        Resolves names to pages, following redirects, with one query per batch of names.
+
+        Parameters:
+        - names (Iterable[str]): The names of the pages.
+        - batch_size (int): The number of names sent per query, at most MAX_TITLES.
+        - exact (bool): Whether the names are titles of the wiki, sent as is rather than formatted with format_name.
+
+        Returns:
+        - dict: A mapping of each name to its Page, or to None if the page does not exist.
+        """
+        return {
+            name: None if entry is None else entry[0]
+            for name, entry in self.pages(names, batch_size, exact=exact).items()
+        }
+
+    def contents(self, names, batch_size: int = MAX_TITLES) -> dict:
+        """
+        Resolves names to pages and reads the wikitext of their latest revision, with one query per batch of names.
+
+        Parameters:
+        - names (Iterable[str]): The names of the pages.
+        - batch_size (int): The number of names sent per query, at most MAX_TITLES.
+
+        Returns:
+        - dict: A mapping of each name to a tuple of its Page and wikitext, or to None if the page does not exist.
+        """
+        return self.pages(names, batch_size, content=True)
+
+    def pages(
+        self,
+        names,
+        batch_size: int = MAX_TITLES,
+        content: bool = False,
+        exact: bool = False,
+    ) -> dict:
+        """
+        Queries the latest revision of the pages of many names, following redirects and the continuation of the API.
+
+        Parameters:
+        - names (Iterable[str]): The names of the pages.
+        - batch_size (int): The number of names sent per query, at most MAX_TITLES.
+        - content (bool): Whether to also read the wikitext of the revisions.
+        - exact (bool): Whether the names are titles of the wiki, sent as is rather than formatted with format_name.
+
+        Returns:
+        - dict: A mapping of each name to a tuple of its Page and wikitext (None without content), or to None if
+          the page does not exist.
+        """
+        names = list(dict.fromkeys(names))
+        batch_size = min(batch_size, MAX_TITLES)
+        resolved = {}
+
+        for start in range(0, len(names), batch_size):
+            batch = names[start : start + batch_size]
+            titles = {
+                name: (name if exact else format_name(name)).replace("_", " ")
+                for name in batch
+            }
+            params = {
+                "titles": "|".join(titles.values()),
+                "redirects": "1",
+                "prop": "revisions",
+                "rvprop": "ids|timestamp|content" if content else "ids|timestamp",
+            }
+            if content:
+                params["rvslots"] = "main"
+
+            aliases, pages = {}, {}
+            while True:
+                answer = self.query(**params)
+                found = answer.get("query", {})
+                for entry in found.get("normalized", []) + found.get("redirects", []):
+                    aliases[entry["from"]] = entry["to"]
+
+                for page in found.get("pages", []):
+                    if page.get("missing") or page.get("invalid"):
+                        continue
+                    # Large answers are split: a page may come without its revision until a later part
+                    if page["title"] in pages and not page.get("revisions"):
+                        continue
+                    revision = (page.get("revisions") or [{}])[0]
+                    text = None
+                    if content:
+                        text = (
+                            revision.get("slots", {}).get("main", {}).get("content", "")
+                        )
+                    pages[page["title"]] = (
+                        Page(
+                            page["title"],
+                            page["pageid"],
+                            revision.get("revid"),
+                            revision.get("timestamp"),
+                        ),
+                        text,
+                    )
+
+                if "continue" not in answer:
+                    break
+                params.update(answer["continue"])
+
+            for name, title in titles.items():
+                seen = set()
+                while title in aliases and title not in seen:
+                    seen.add(title)
+                    title = aliases[title]
+                resolved[name] = pages.get(title)
+
+        return resolved
+
+    def recent_changes(self, since: str, namespace: int = 0) -> dict:
+        """
+        Lists the pages edited or created since a time, following the continuation of the API.
+
+        Parameters:
+        - since (str): The ISO 8601 timestamp to list the changes from, e.g. "2026-01-01T00:00:00Z".
+        - namespace (int): The namespace of the pages. Articles by default.
+
+        Returns:
+        - dict: A mapping of the title of each changed page to the ID of its latest revision.
+        """
+        params = {
+            "list": "recentchanges",
+            "rcstart": since,
+            "rcdir": "newer",
+            "rcnamespace": str(namespace),
+            "rctype": "edit|new",
+            "rcprop": "title|ids|timestamp",
+            "rclimit": "500",
+        }
+        changes = {}
+        while True:
+            answer = self.query(**params)
+            for change in answer.get("query", {}).get("recentchanges", []):
+                # Changes are listed from the oldest, so the last one of a page is its latest revision
+                changes[change["title"]] = change.get("revid")
+            if "continue" not in answer:
+                return changes
+            params.update(answer["continue"])
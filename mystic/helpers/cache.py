@@ -0,0 +1,134 @@
+"""On-disk cache of the wiki pages fetched by the API."""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class PageCache:
+    """
+    Stores the body and the validators (ETag / Last-Modified) of fetched pages on disk, keyed by URL.
+
+    Every page is kept as two files named after the hash of its URL: the raw body and a JSON metadata file.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initializes a PageCache object.
+
+        Parameters:
+        - directory (str): The directory the pages are stored in. Created if missing.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, url: str) -> str:
+        """
+        Returns the path the page of the given URL is stored at, without extension.
+
+        Parameters:
+        - url (str): The URL of the page.
+
+        Returns:
+        - str: The path of the page in the cache.
+        """
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest())
+
+    def get(self, url: str) -> requests.Response:
+        """
+        Retrieves the cached page of the given URL.
+
+        Parameters:
+        - url (str): The URL of the page.
+
+        Returns:
+        - requests.Response: The cached page, or None if the URL is not cached.
+        """
+        path = self.path(url)
+        try:
+            with open(path + ".json", encoding="utf-8") as file:
+                meta = json.load(file)
+            with open(path + ".body", "rb") as file:
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = meta["encoding"]
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        response._content = body
+        response.from_cache = True
+        return response
+
+    def validators(self, url: str) -> dict:
+        """
+        Returns the conditional request headers for the cached page of the given URL.
+
+        Parameters:
+        - url (str): The URL of the page.
+
+        Returns:
+        - dict: The If-None-Match / If-Modified-Since headers, empty if the URL is not cached.
+        """
+        try:
+            with open(self.path(url) + ".json", encoding="utf-8") as file:
+                headers = json.load(file)["headers"]
+        except (OSError, ValueError):
+            return {}
+
+        validators = {}
+        if "ETag" in headers:
+            validators["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            validators["If-Modified-Since"] = headers["Last-Modified"]
+        return validators
+
+    def put(self, url: str, response: requests.Response):
+        """
+        Stores a successfully fetched page.
+
+        Parameters:
+        - url (str): The URL the page was requested with.
+        - response (requests.Response): The page to store.
+        """
+        path = self.path(url)
+        headers = {
+            key: response.headers[key]
+            for key in ("ETag", "Last-Modified", "Content-Type")
+            if key in response.headers
+        }
+        meta = {"url": url, "encoding": response.encoding, "headers": headers}
+
+        self._write(path + ".body", response.content)
+        self._write(path + ".json", json.dumps(meta).encode())
+
+    def delete(self, url: str):
+        """
+        Removes the cached page of the given URL, if any.
+
+        Parameters:
+        - url (str): The URL of the page.
+        """
+        path = self.path(url)
+        for extension in (".json", ".body"):
+            try:
+                os.remove(path + extension)
+            except FileNotFoundError:
+                pass
+
+    def _write(self, path: str, data: bytes):
+        """Writes a file atomically so that concurrent readers never see it half written."""
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
@@ -0,0 +1,328 @@
+"""HTTP client shared by the objects of the API to talk to the wiki."""
+
+import asyncio
+import email.utils
+import functools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mystic.helpers.cache import PageCache
+from mystic.helpers.exceptions import CacheMissError, ThrottledError, TransportError
+from mystic.helpers.misc import WEB_URL
+from mystic.helpers.ratelimit import RateLimiter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5.0, 30.0)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+# The statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def retry_after(response: requests.Response) -> float:
+    """
+    Reads the Retry-After header of a response.
+
+    Parameters:
+    - response (requests.Response): The response of the server.
+
+    Returns:
+    - float: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+class Client:
+    """A pooled, keep-alive HTTP client around a requests.Session."""
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: tuple = DEFAULT_TIMEOUT,
+        headers: dict = None,
+        base_url: str = WEB_URL,
+        cache: PageCache = None,
+        offline: bool = False,
+        rate_limiter: RateLimiter = None,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_retry_after: float = MAX_BACKOFF,
+    ):
+        """
+        Initializes a Client object.
+
+        Parameters:
+        - pool_size (int): The maximum number of connections kept alive per host.
+        - timeout (tuple): The (connect, read) timeouts in seconds applied to every request.
+        - headers (dict): Extra headers sent with every request.
+        - base_url (str): The wiki URL that page names are appended to.
+        - cache (PageCache): The on-disk cache to revalidate pages against. Pages are not cached if None.
+        - offline (bool): Whether to serve pages from the cache only, without any network access.
+        - rate_limiter (RateLimiter): The token bucket every request waits on. Requests are not limited if None.
+        - retries (int): The number of retries of a request failing with 429, a 5xx status, a connection error or
+          a body cut short.
+        - backoff (float): The base delay in seconds between retries, doubled on each retry, with full jitter.
+        - max_retry_after (float): The longest Retry-After in seconds the client waits. Longer ones fail at once.
+        """
+        self.base_url = base_url
+        self.cache = cache
+        self.offline = offline
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the pooled session.
+
+        With a cache, the request is made conditional on the validators of the cached page,
+        and the cached page is returned when the server answers 304 Not Modified.
+
+        Parameters:
+        - url (str): The URL to fetch.
+        - **kwargs: Extra arguments passed to requests.Session.get.
+
+        Returns:
+        - requests.Response: The response of the server, or of the cache.
+
+        Raises:
+        - CacheMissError: If the client is offline and the page is not cached, or it has no cache.
+        - ThrottledError: If the server still answers 429 Too Many Requests after every retry.
+        - TransportError: If the server cannot be reached or still answers with a 5xx status after every retry.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if self.offline:
+            # An offline client never reaches the network, even without a cache
+            response = None if self.cache is None else self.cache.get(url)
+            if response is None:
+                raise CacheMissError(f"{url} is not cached.")
+            return response
+
+        if self.cache is None:
+            return self.send(url, **kwargs)
+
+        own_headers = kwargs.pop("headers", {})
+        headers = {**self.cache.validators(url), **own_headers}
+        response = self.send(url, headers=headers, **kwargs)
+        if response.status_code == 304:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+            # The cached copy is gone: ask again without the validators, keeping the other headers of the caller
+            headers = {
+                key: value
+                for key, value in own_headers.items()
+                if key not in ("If-None-Match", "If-Modified-Since")
+            }
+            response = self.send(url, headers=headers, **kwargs)
+
+        if response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def send(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the rate limiter, retrying throttled and failed requests.
+
+        Retries wait for the Retry-After header of the server when it is given, and otherwise back off
+        exponentially with full jitter. A 429 also pauses the rate limiter, holding back every other request.
+        A Retry-After longer than max_retry_after is not waited for: the request fails with it at once.
+
+        Parameters:
+        - url (str): The URL to fetch.
+        - **kwargs: Extra arguments passed to requests.Session.get.
+
+        Returns:
+        - requests.Response: The response of the server, which may still be an error such as 404.
+
+        Raises:
+        - ThrottledError: If the server still answers 429 Too Many Requests after every retry, or asks to wait
+          longer than max_retry_after.
+        - TransportError: If the server cannot be reached, cuts the body short or still answers with a 5xx status
+          after every retry.
+        """
+        for attempt in range(self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.session.get(url, **kwargs)
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            ) as error:
+                if attempt == self.retries:
+                    raise TransportError(
+                        f"{url} could not be fetched: {error}"
+                    ) from error
+                time.sleep(self.delay(attempt))
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                return response
+
+            wait = retry_after(response)
+            too_long = wait is not None and wait > self.max_retry_after
+            if attempt == self.retries or too_long:
+                if response.status_code == 429:
+                    raise ThrottledError(f"{url} is throttled.", wait)
+                raise TransportError(
+                    f"{url} answered {response.status_code}.", response.status_code
+                )
+
+            if wait is None:
+                wait = self.delay(attempt)
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.rate_limiter.pause(wait)
+            time.sleep(wait)
+
+    def delay(self, attempt: int) -> float:
+        """
+        Returns a random delay before a retry, growing exponentially with the attempt.
+
+        Parameters:
+        - attempt (int): The number of the failed attempt, starting at 0.
+
+        Returns:
+        - float: The delay in seconds.
+        """
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff * 2**attempt))
+
+    def close(self):
+        """Closes every pooled connection of the client."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class AsyncClient:
+    """
+    An asyncio front-end for a Client.
+
+    Requests run on a bounded thread pool so that they never block the event loop,
+    while still sharing the keep-alive connections of the underlying Client.
+    """
+
+    def __init__(self, client: Client = None, concurrency: int = None):
+        """
+        Initializes an AsyncClient object.
+
+        Parameters:
+        - client (Client): The client to send the requests with. Defaults to the shared client.
+        - concurrency (int): The maximum number of requests in flight. Defaults to the pool size of the client.
+        """
+        self.client = client or get_client()
+        self.base_url = self.client.base_url
+        self.concurrency = concurrency or self.client.pool_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="mystic-http"
+        )
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request without blocking the running event loop.
+
+        Parameters:
+        - url (str): The URL to fetch.
+        - **kwargs: Extra arguments passed to Client.get.
+
+        Returns:
+        - requests.Response: The response of the server.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self.client.get, url, **kwargs)
+        )
+
+    def close(self):
+        """Shuts down the request threads of the client."""
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+
+_default_client = None
+_default_async_client = None
+
+
+def get_client() -> Client:
+    """
+    Returns the client shared by every object that is not given one explicitly.
+
+    Returns:
+    - Client: The shared client, created on first use.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = Client()
+    return _default_client
+
+
+def set_client(client: Client):
+    """
+    Replaces the shared client, e.g. to change the pool size or the timeouts.
+
+    Parameters:
+    - client (Client): The client to share from now on.
+    """
+    global _default_client
+    _default_client = client
+
+
+def get_async_client() -> AsyncClient:
+    """
+    Returns the async client shared by every coroutine that is not given one explicitly.
+
+    Returns:
+    - AsyncClient: The shared async client, created on first use around the shared client.
+    """
+    global _default_async_client
+    if _default_async_client is None:
+        _default_async_client = AsyncClient()
+    return _default_async_client
+
+
+def set_async_client(client: AsyncClient):
+    """
+    Replaces the shared async client, e.g. to point it at another server.
+
+    Parameters:
+    - client (AsyncClient): The async client to share from now on.
+    """
+    global _default_async_client
+    _default_async_client = client
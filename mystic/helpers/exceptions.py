@@ -6,3 +6,28 @@ class NotFoundError(Exception):
     """Raised when a resource is not found"""
 
     pass
+
+
+class CacheMissError(Exception):
+
+    """Raised when a page is not cached while the client is offline. The page may still exist on the wiki"""
+
+    pass
+
+
+class TransportError(Exception):
+
+    """Raised when the wiki cannot be reached or keeps answering with an error other than a missing page"""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ThrottledError(TransportError):
+
+    """Raised when the wiki keeps answering 429 Too Many Requests"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message, 429)
+        self.retry_after = retry_after
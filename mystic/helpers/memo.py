@@ -0,0 +1,256 @@
+"""In-process memoization helpers of the API."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Call:
+    """A call in progress of a SingleFlight, with its outcome once done."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key, so that only the first caller does the work.
+
+    The other callers wait for it and share its result, or its exception. Nothing is kept once the call is done.
+    """
+
+    def __init__(self):
+        """Initializes a SingleFlight object."""
+        self.shared = 0
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, factory):
+        """
+        Calls factory, unless a call with the same key is already in progress on another thread.
+
+        Parameters:
+        - key: The key of the call.
+        - factory (Callable): Called without arguments to produce the value.
+
+        Returns:
+        - The value produced by the call in progress, or by this one.
+
+        Raises:
+        - Any exception raised by the factory of the call in progress, or of this one.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = factory()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key, factory):
+        """
+        Awaits factory(), unless a call with the same key is already in progress on the running event loop.
+
+        A waiter being cancelled does not cancel the shared call, but the first caller being cancelled does.
+
+        Parameters:
+        - key: The key of the call.
+        - factory (Callable): Called without arguments to produce the awaitable of the value.
+
+        Returns:
+        - The value produced by the call in progress, or by this one.
+
+        Raises:
+        - Any exception raised by the awaitable of the call in progress, or of this one.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            future = self._futures.get((loop, key))
+            leader = future is None
+            if leader:
+                future = self._futures[(loop, key)] = loop.create_future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Waiters are optional, so the exception does not need to be retrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._futures[(loop, key)]
+
+
+class LRUCache:
+    """A thread-safe, size-bounded LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = None):
+        """
+        Initializes an LRUCache object.
+
+        Parameters:
+        - maxsize (int): The maximum number of entries kept. The least recently used entry is evicted first.
+        - ttl (float): The number of seconds an entry stays valid. Entries never expire if None.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Retrieves the value cached under the given key.
+
+        Parameters:
+        - key: The key of the entry.
+        - default: The value returned if the key is missing or expired.
+
+        Returns:
+        - The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Caches a value under the given key, evicting the least recently used entries if full.
+
+        Parameters:
+        - key: The key of the entry.
+        - value: The value to cache.
+        """
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """
+        Retrieves the value cached under the given key, creating and caching it on a miss.
+
+        Concurrent misses of the same key are coalesced, so that the value is created only once.
+
+        Parameters:
+        - key: The key of the entry.
+        - factory (Callable): Called without arguments to create the value on a miss.
+
+        Returns:
+        - The cached or newly created value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+
+            def create():
+                value = factory()
+                self.put(key, value)
+                return value
+
+            value = self._flights.do(key, create)
+        return value
+
+    def items(self) -> list:
+        """
+        Returns the entries that have not expired, without counting hits or reordering them.
+
+        Returns:
+        - list[tuple]: The key and value of each entry, from the least to the most recently used.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (expires, value) in self._entries.items()
+                if expires is None or expires > now
+            ]
+
+    def invalidate(self, key) -> bool:
+        """
+        Removes the entry of the given key.
+
+        Parameters:
+        - key: The key of the entry.
+
+        Returns:
+        - bool: Whether an entry was removed.
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Removes every entry and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self._flights.shared = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+        - dict: The hits, misses, evictions, coalesced misses and current size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self._flights.shared,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,31 +1,68 @@
 """Helper functions for miscellaneous tasks"""
 
-from nltk import pos_tag
+from functools import lru_cache
 
+# The wiki the pages are read from. Kept here so that it is known without importing the HTTP client
+WEB_URL = "https://lordofthemysteries.fandom.com/wiki/"
 
+# Articles, prepositions and conjunctions that stay lowercase in wiki page names
+MINOR_WORDS = frozenset(
+    {
+        "a",
+        "an",
+        "the",
+        "and",
+        "but",
+        "or",
+        "nor",
+        "for",
+        "so",
+        "yet",
+        "as",
+        "at",
+        "by",
+        "in",
+        "of",
+        "off",
+        "on",
+        "per",
+        "to",
+        "up",
+        "via",
+        "from",
+        "into",
+        "onto",
+        "with",
+        "over",
+        "than",
+        "upon",
+    }
+)
+
+
+@lru_cache(maxsize=4096)
 def format_name(text):
     """
-    This function takes a string as input, splits it into words, and capitalizes each word that is not a preposition or conjunction.
-    It then joins the words together with underscores and returns the result.
+    This function takes a string as input, splits it into words, and capitalizes each word that is not an article, preposition or conjunction.
+    The first and the last words, and single letters such as the "A" of "Mr. A", are always capitalized.
+    It then joins the words together with underscores and returns the result. Results are memoized.
 
     Parameters:
     text (str): The input string to be formatted.
 
     Returns:
-    str: The formatted string with capitalized words (excluding prepositions and conjunctions) joined by underscores.
+    str: The formatted string with capitalized words (excluding articles, prepositions and conjunctions) joined by underscores.
     """
-    # POS tagging the words in the input string
-    tagged_words = pos_tag(text.split())
-
-    # List of POS tags for words to be excluded
-    excluded_pos_tags = ["IN", "CC"]
-
-    # Capitalizing each word that is not a preposition or conjunction
-    capitalized_words = []
-    for word, tag in tagged_words:
-        if tag not in excluded_pos_tags:
-            capitalized_words.append(word.capitalize())
+    words = []
+    parts = text.split()
+    for position, word in enumerate(parts):
+        if (
+            0 < position < len(parts) - 1
+            and len(word) > 1
+            and word.lower() in MINOR_WORDS
+        ):
+            words.append(word.lower())
         else:
-            capitalized_words.append(word.lower())
+            words.append(word.capitalize())
 
-    return "_".join(capitalized_words)
+    return "_".join(words)
@@ -0,0 +1,58 @@
+"""Token-bucket rate limiting shared by the threads sending requests to the wiki."""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket.
+
+    Tokens are refilled at a steady rate up to a burst size, and each request takes one.
+    The bucket can also be paused, e.g. when the server asks to retry after some time.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 10):
+        """
+        Initializes a RateLimiter object.
+
+        Parameters:
+        - rate (float): The number of requests allowed per second, on average.
+        - burst (int): The maximum number of requests sent back to back after an idle period.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Takes a token, possibly in advance, and returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(delay, self._paused_until - now)
+
+    def acquire(self):
+        """Blocks the calling thread until a request may be sent."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Holds back every request for some time, e.g. after a 429 Too Many Requests.
+
+        Parameters:
+        - seconds (float): The time to wait before the next request.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
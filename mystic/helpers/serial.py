@@ -0,0 +1,96 @@
+"""Encoding of character data to JSON or MessagePack bytes, one at a time or many in one buffer."""
+
+import json
+
+FORMATS = ("json", "msgpack")
+
+
+def _msgpack():
+    """Imports msgpack, which is only needed for the msgpack format."""
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError(
+            "The msgpack format requires msgpack: pip install msgpack"
+        ) from None
+    return msgpack
+
+
+def _check(format: str):
+    """Raises a ValueError for an unknown format."""
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format {format!r}, expected one of {FORMATS}.")
+
+
+def dumps(data: dict, format: str = "json") -> bytes:
+    """
+    Encodes the data of a character.
+
+    Parameters:
+    - data (dict): The data of the character.
+    - format (str): "json" or "msgpack".
+
+    Returns:
+    - bytes: The encoded data.
+    """
+    _check(format)
+    if format == "msgpack":
+        return _msgpack().packb(data, use_bin_type=True)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(payload: bytes, format: str = "json") -> dict:
+    """
+    Decodes the data of a character encoded with dumps.
+
+    Parameters:
+    - payload (bytes): The encoded data.
+    - format (str): "json" or "msgpack".
+
+    Returns:
+    - dict: The data of the character.
+    """
+    _check(format)
+    if format == "msgpack":
+        return _msgpack().unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def dumps_many(items, format: str = "json") -> bytes:
+    """
+    Encodes the data of many characters into one buffer: JSON Lines, or a stream of MessagePack maps.
+
+    Parameters:
+    - items (Iterable[dict]): The data of the characters.
+    - format (str): "json" or "msgpack".
+
+    Returns:
+    - bytes: The encoded data.
+    """
+    _check(format)
+    if format == "msgpack":
+        packer = _msgpack().Packer(use_bin_type=True)
+        return b"".join(packer.pack(data) for data in items)
+    return b"".join(dumps(data) + b"\n" for data in items)
+
+
+def loads_many(payload: bytes, format: str = "json"):
+    """
+    Decodes the data of many characters encoded with dumps_many.
+
+    Parameters:
+    - payload (bytes): The encoded data.
+    - format (str): "json" or "msgpack".
+
+    Yields:
+    - dict: The data of each character, in order.
+    """
+    _check(format)
+    if format == "msgpack":
+        unpacker = _msgpack().Unpacker(raw=False)
+        unpacker.feed(payload)
+        yield from unpacker
+        return
+    for line in payload.splitlines():
+        if line.strip():
+            yield json.loads(line)
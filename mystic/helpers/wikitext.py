@@ -0,0 +1,128 @@
+"""Helper functions to read the wikitext source of pages"""
+
+import re
+
+COMMENT = re.compile(r"<!--.*?-->", re.S)
+REFERENCE = re.compile(r"<ref[^>/]*/>|<ref[^>]*>.*?</ref>", re.S | re.I)
+LINE_BREAK = re.compile(r"<br\s*/?>", re.I)
+TAG = re.compile(r"<[^>]+>")
+LINK = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]")
+EXTERNAL_LINK = re.compile(r"\[https?://\S+\s*([^\]]*)\]")
+FORMATTING = re.compile(r"'{2,}")
+POEM = re.compile(r"<poem>(.*?)</poem>", re.S | re.I)
+BRACES = re.compile(r"\{\{|\}\}")
+
+
+def split_top_level(text, separator="|"):
+    """
+    Splits a string on a separator, ignoring the separators nested in links or templates.
+
+    Parameters:
+    text (str): The string to split.
+    separator (str): The character to split on.
+
+    Returns:
+    list[str]: The parts of the string.
+    """
+    parts = []
+    depth = 0
+    start = 0
+    for token in re.finditer(r"\{\{|\[\[|\}\}|\]\]|" + re.escape(separator), text):
+        if token.group() in ("{{", "[["):
+            depth += 1
+        elif token.group() in ("}}", "]]"):
+            depth = max(depth - 1, 0)
+        elif depth == 0:
+            parts.append(text[start : token.start()])
+            start = token.end()
+    parts.append(text[start:])
+    return parts
+
+
+def find_templates(text):
+    """
+    Finds the templates used at the top level of a page, with their named parameters.
+
+    Parameters:
+    text (str): The wikitext of the page.
+
+    Returns:
+    list[tuple]: The templates as a list of tuple ~ (Template Name, {Parameter: Value}, Start Offset, End Offset).
+    """
+    templates = []
+    depth = 0
+    for brace in BRACES.finditer(text):
+        if brace.group() == "{{":
+            if depth == 0:
+                start = brace.start()
+            depth += 1
+            continue
+        if depth == 0:
+            continue
+        depth -= 1
+        if depth > 0:
+            continue
+
+        end = brace.end()
+        name, *arguments = split_top_level(text[start + 2 : end - 2])
+        parameters = {}
+        for argument in arguments:
+            key, equals, value = argument.partition("=")
+            if equals:
+                parameters[key.strip().lower()] = value.strip()
+        templates.append((name.strip(), parameters, start, end))
+
+    return templates
+
+
+def clean(value):
+    """
+    Turns a wikitext value into plain text, keeping the labels of links and dropping references and nested templates.
+
+    Parameters:
+    value (str): The wikitext value.
+
+    Returns:
+    str: The plain text, with line breaks where the value had <br> tags.
+    """
+    value = COMMENT.sub("", value)
+    value = REFERENCE.sub("", value)
+    value = LINE_BREAK.sub("\n", value)
+    value = LINK.sub(r"\1", value)
+    value = EXTERNAL_LINK.sub(r"\1", value)
+    for _, _, start, end in find_templates(value)[::-1]:
+        value = value[:start] + value[end:]
+    value = TAG.sub("", value)
+    value = FORMATTING.sub("", value)
+    return value.strip()
+
+
+def clean_list(value):
+    """
+    Turns a wikitext value into a list of plain text items, split on bullets and line breaks.
+
+    Parameters:
+    value (str): The wikitext value.
+
+    Returns:
+    list[str]: The non-empty items of the value.
+    """
+    items = []
+    for line in clean(value).splitlines():
+        line = line.strip().lstrip("*#").strip()
+        if line:
+            items.append(line)
+    return items
+
+
+def find_poems(text):
+    """
+    Finds the <poem> blocks of a page.
+
+    Parameters:
+    text (str): The wikitext of the page.
+
+    Returns:
+    list[str]: The plain text of each poem.
+    """
+    return [clean(poem) for poem in POEM.findall(text)]
@@ -1,3 +1,4 @@
 """Structure of the objects that are used in the API."""
 
 from mystic.objectStructures.characterStructure import *
+from mystic.objectStructures.characterStructure import __getattr__
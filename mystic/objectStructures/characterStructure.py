@@ -1,33 +1,390 @@
 """Structure for Characters class of the API."""
 
-import requests
-import bs4
+import threading
+import time
+from functools import lru_cache
+
 import mystic.helpers as helpers
 
-WEB_URL = "https://lordofthemysteries.fandom.com/wiki/"
+WEB_URL = helpers.misc.WEB_URL
+
+# The classes of the parts of a page the getters read: the article body, the infobox and the poems
+CONTENT_CLASSES = ("mw-parser-output", "portable-infobox", "poem")
+
+
+@lru_cache(maxsize=None)
+def content_strainer():
+    """
+    Returns CONTENT_STRAINER, the SoupStrainer of CONTENT_CLASSES, building it on first use.
+
+    bs4 is imported here rather than with the module, so that importing the API does not pull it in.
+
+    Returns:
+    - SoupStrainer: The strainer keeping the parts of a page the getters read.
+    """
+    import bs4
+
+    return bs4.SoupStrainer(class_=list(CONTENT_CLASSES))
+
+
+def __getattr__(name):
+    if name == "CONTENT_STRAINER":
+        return content_strainer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class ContentStrainer:
+    """The default parse_only of characters: CONTENT_STRAINER, built when it is first read."""
+
+    def __get__(self, instance, owner):
+        return content_strainer()
+
+
+class LazyField:
+    """
+    An attribute of a character that is extracted by its getter on first access, then memoized on the instance.
+    """
+
+    def __init__(self, getter: str):
+        """
+        Initializes a LazyField object.
+
+        Parameters:
+        - getter (str): The name of the method that extracts the value of the field.
+        """
+        self.getter = getter
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        with instance._lock:
+            if self.name not in instance.__dict__:
+                if instance.trace is None:
+                    value = getattr(instance, self.getter)()
+                else:
+                    started = time.perf_counter()
+                    value = getattr(instance, self.getter)()
+                    instance.record(self.name, started)
+                instance.__dict__[self.name] = value
+            return instance.__dict__[self.name]
+
+
+class Trace:
+    """
+    The instrumentation of the loading of a character: the time spent in each stage, and what was downloaded.
+
+    Stages are "format", "fetch", "parse", "infobox", "name", then each field as it is extracted. requests does not
+    expose the DNS, connect and TLS times, so "fetch" covers the whole request, retries and rate limiting included.
+    """
+
+    __slots__ = ("timings", "page_bytes", "wire_bytes", "from_cache", "server_seconds")
+
+    def __init__(self):
+        """Initializes an empty Trace object."""
+        # The seconds spent in each stage, in the order they ran
+        self.timings = {}
+        # The size of the page once decompressed, None if it was not read yet
+        self.page_bytes = None
+        # The size of the body read off the network, compressed as sent, 0 if the page was served by the cache
+        # and None if it is unknown, e.g. for a response given by the caller
+        self.wire_bytes = None
+        # Whether the page was served by the PageCache of the client
+        self.from_cache = False
+        # The seconds between sending the request and reading the response headers, as measured by requests
+        self.server_seconds = None
+
+    def total(self) -> float:
+        """
+        Returns the time spent in every stage.
+
+        Returns:
+        - float: The total time in seconds.
+        """
+        return sum(self.timings.values())
+
+    def __repr__(self) -> str:
+        stages = ", ".join(
+            f"{stage}={seconds * 1000:.2f}ms" for stage, seconds in self.timings.items()
+        )
+        return (
+            f"Trace({stages}, page_bytes={self.page_bytes}, "
+            f"wire_bytes={self.wire_bytes}, from_cache={self.from_cache})"
+        )
 
 
 class CharacterStructure:
     """Represents a character in the Lord of the Mysteries universe."""
 
-    def __init__(self, name: str):
+    fields = ()
+    hidden = (
+        "response",
+        "parsed",
+        "infobox",
+        "url_name",
+        "trace",
+        "revision",
+        "_lock",
+    )
+    # The Page of the latest revision of the page, when it was resolved through the API
+    revision = None
+
+    # The BeautifulSoup tree builder, e.g. "html.parser", "lxml" or "html5lib"
+    parser = "html.parser"
+    # Restricts the tree to the matching elements, or builds the whole page if None. CONTENT_STRAINER by default
+    parse_only = ContentStrainer()
+    # Coalesces concurrent fetches of the same page
+    flights = helpers.memo.SingleFlight()
+    # Whether to record a Trace on every character. Also enabled while any hook is registered
+    tracing = False
+    # The callbacks called with (character, stage, seconds) as each stage of a character ends
+    hooks = []
+    # Whether to extract every field on construction, then release the page and its parsed tree
+    low_memory = False
+
+    def __init_subclass__(cls, **kwargs):
+        """Collects the lazy fields of a subclass, in the order they are defined."""
+        super().__init_subclass__(**kwargs)
+        fields = list(cls.fields)
+        for name, value in vars(cls).items():
+            if isinstance(value, LazyField) and name not in fields:
+                fields.append(name)
+        cls.fields = tuple(fields)
+
+    def __init__(
+        self,
+        name: str,
+        client: "helpers.client.Client" = None,
+        response=None,
+        url_name: str = None,
+    ):
         """
         Initializes a CharacterStructure object.
 
+        With low_memory set, every field is extracted right away and the page and its parsed tree are released.
+
         Parameters:
         - name (str): The name of the character.
+        - client (Client): The HTTP client to fetch the page with. Defaults to the shared client.
+        - response (requests.Response): An already fetched page of the character. Skips the fetch when given.
+        - url_name (str): The URL name of the page, used as is, e.g. from a title of the API. Formatted from the name if None.
 
         Raises:
         - NotFoundError: If the character is not found on the website.
+        - TransportError: If the website could not serve the page, e.g. because of a server error.
         """
-        self.url_name = helpers.misc.format_name(name)
-        self.url = WEB_URL + self.url_name
-        self.response = requests.get(self.url)
-        if self.response.status_code != 200:
+        self._lock = threading.RLock()
+        self.trace = Trace() if self.tracing or self.hooks else None
+        started = None if self.trace is None else time.perf_counter()
+
+        client = client or helpers.client.get_client()
+        self.url_name = url_name or helpers.misc.format_name(name)
+        self.url = client.base_url + self.url_name
+        started = self.record("format", started)
+        if response is None:
+            response = client.get(self.url)
+            started = self.record("fetch", started)
+        self.response = response
+        if self.trace is not None:
+            self.trace.page_bytes = len(response.content)
+            self.trace.from_cache = getattr(response, "from_cache", False)
+            tell = getattr(response.raw, "tell", None)
+            if self.trace.from_cache:
+                self.trace.wire_bytes = 0
+            elif tell is not None:
+                self.trace.wire_bytes = tell()
+            if not self.trace.from_cache and response.elapsed:
+                self.trace.server_seconds = response.elapsed.total_seconds()
+
+        if self.response.status_code in (404, 410):
             raise helpers.exceptions.NotFoundError("Character not found.")
+        if self.response.status_code != 200:
+            raise helpers.exceptions.TransportError(
+                f"{self.url} answered {self.response.status_code}.",
+                self.response.status_code,
+            )
 
-        self.parsed = bs4.BeautifulSoup(self.response.text, "html.parser")
+        self.parsed = self.parse(self.response.text)
+        if self.low_memory:
+            # The tree holds everything the getters need, so the page can go first
+            self.response = None
+        started = self.record("parse", started)
+        self.infobox = self.index_infobox()
+        started = self.record("infobox", started)
         self.name = self.get_name()
+        self.record("name", started)
+
+        if self.low_memory:
+            self.load_fields()
+            self.release()
+
+    def release(self):
+        """
+        Extracts every lazy field, then frees the page and its parsed tree, keeping only the extracted data.
+
+        Called on construction in low-memory mode. The getters cannot be called anymore afterwards.
+        """
+        self.load_fields()
+        with self._lock:
+            if self.parsed is not None:
+                # Break the parent and child cycles of the tree, so that it is freed right away
+                self.parsed.decompose()
+            self.response = None
+            self.parsed = None
+            self.infobox = None
+
+    @classmethod
+    def add_hook(cls, hook):
+        """
+        Registers a callback called as each stage of loading a character ends, e.g. to forward timings to metrics.
+
+        Registering a hook turns tracing on. Hooks run on the thread loading the character, possibly before it is fully built.
+
+        Parameters:
+        - hook (Callable): Called with the character, the name of the stage and the seconds it took.
+
+        Returns:
+        - Callable: The hook, so that this can be used as a decorator.
+        """
+        cls.hooks.append(hook)
+        return hook
+
+    @classmethod
+    def remove_hook(cls, hook):
+        """
+        Unregisters a callback registered with add_hook.
+
+        Parameters:
+        - hook (Callable): The callback.
+        """
+        cls.hooks.remove(hook)
+
+    def record(self, stage: str, started: float) -> float:
+        """
+        Records the time spent in a stage on the trace of the character and passes it to the hooks.
+
+        Parameters:
+        - stage (str): The name of the stage, e.g. "parse".
+        - started (float): The time.perf_counter() value when the stage started.
+
+        Returns:
+        - float: The time.perf_counter() value when the stage ended, or None if tracing is off.
+        """
+        if self.trace is None:
+            return None
+        ended = time.perf_counter()
+        seconds = ended - started
+        self.trace.timings[stage] = seconds
+        # A copy, so that a hook may remove itself or others
+        for hook in tuple(self.hooks):
+            hook(self, stage, seconds)
+        return ended
+
+    @classmethod
+    def fetch(
+        cls, name: str, client: "helpers.client.Client" = None, url_name: str = None
+    ):
+        """
+        Builds a character and extracts all of its fields.
+
+        Concurrent fetches of the same page are coalesced: the first caller fetches and parses it,
+        and the others share its character, or its error.
+
+        Parameters:
+        - name (str): The name of the character.
+        - client (Client): The HTTP client to fetch the page with. Defaults to the shared client.
+        - url_name (str): The URL name of the page, used as is. Formatted from the name if None.
+
+        Returns:
+        - CharacterStructure: The built character.
+
+        Raises:
+        - NotFoundError: If the character is not found on the website.
+        """
+        client = client or helpers.client.get_client()
+        url_name = url_name or helpers.misc.format_name(name)
+        key = (cls, client.base_url + url_name)
+
+        def build():
+            character = cls(name, client, url_name=url_name)
+            character.load_fields()
+            return character
+
+        return cls.flights.do(key, build)
+
+    @classmethod
+    async def afetch(cls, name: str, client: "helpers.client.AsyncClient" = None):
+        """
+        Fetches and builds a character without blocking the running event loop.
+
+        The page is downloaded through the async client, then parsed and extracted on a worker thread.
+        Concurrent fetches of the same page on the event loop are coalesced, like with fetch.
+
+        Parameters:
+        - name (str): The name of the character.
+        - client (AsyncClient): The async HTTP client to fetch the page with. Defaults to the shared async client.
+
+        Returns:
+        - CharacterStructure: The built character.
+
+        Raises:
+        - NotFoundError: If the character is not found on the website.
+        """
+        client = client or helpers.client.get_async_client()
+        url = client.base_url + helpers.misc.format_name(name)
+
+        async def load():
+            response = await client.get(url)
+
+            def build():
+                character = cls(name, client.client, response)
+                character.load_fields()
+                return character
+
+            import asyncio
+
+            return await asyncio.to_thread(build)
+
+        return await cls.flights.do_async((cls, url), load)
+
+    def parse(self, text: str) -> "bs4.BeautifulSoup":
+        """
+        Parses a page with the configured parser, keeping only the elements matched by parse_only.
+
+        Parameters:
+        - text (str): The HTML of the page.
+
+        Returns:
+        - BeautifulSoup: The parsed page.
+        """
+        import bs4
+
+        if self.parser == "html5lib":
+            # html5lib always builds the whole tree
+            return bs4.BeautifulSoup(text, self.parser)
+        return bs4.BeautifulSoup(text, self.parser, parse_only=self.parse_only)
+
+    def index_infobox(self) -> dict:
+        """
+        Walks the portable infobox of the page once and indexes its fields by label.
+
+        Returns:
+        - dict: A mapping of each header label (e.g. "Birth", "Mysticism") to the node holding its value.
+        """
+        infoboxes = self.parsed.find_all("aside", class_="portable-infobox")
+        if len(infoboxes) == 0:
+            infoboxes = [self.parsed]
+
+        index = {}
+        for infobox in infoboxes:
+            for head in infobox.find_all(["h2", "h3"]):
+                if head.string is not None:
+                    index.setdefault(str(head.string), head.parent)
+
+        return index
 
     def get_name(self):
         """
@@ -38,20 +395,88 @@ class CharacterStructure:
         """
         pass
 
+    def load_fields(self):
+        """Extracts every lazy field of the character that has not been accessed yet."""
+        for field in self.fields:
+            getattr(self, field)
+
     def get_data(self) -> dict:
         """
-        Retrieves the data of the character.
+        Retrieves the data of the character, extracting every lazy field.
 
         Returns:
         - dict: The data of the character.
         """
-        data = self.__dict__
-        data.pop("response")
-        data.pop("parsed")
-        data.pop("url_name")
+        self.load_fields()
+        data = {
+            key: value
+            for key, value in self.__dict__.items()
+            if key not in self.hidden and key not in self.fields
+        }
+        data.update((field, self.__dict__[field]) for field in self.fields)
 
         return data
 
+    def to_bytes(self, format: str = "json") -> bytes:
+        """
+        Encodes the data of the character, extracting every lazy field.
+
+        Parameters:
+        - format (str): "json" or "msgpack". The msgpack format requires the msgpack package.
+
+        Returns:
+        - bytes: The encoded data, which from_bytes turns back into a character.
+        """
+        return helpers.serial.dumps(self.get_data(), format)
+
+    def to_json(self) -> bytes:
+        """Encodes the data of the character as JSON."""
+        return self.to_bytes("json")
+
+    def to_msgpack(self) -> bytes:
+        """Encodes the data of the character as MessagePack."""
+        return self.to_bytes("msgpack")
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Rebuilds a character from its data, without fetching or parsing its page.
+
+        The character holds every field, but no page: its getters cannot be called.
+
+        Parameters:
+        - data (dict): The data of the character, as returned by get_data().
+
+        Returns:
+        - CharacterStructure: The rebuilt character.
+        """
+        character = cls.__new__(cls)
+        character._lock = threading.RLock()
+        character.trace = None
+        character.url = data["url"]
+        character.url_name = data["url"].rstrip("/").rsplit("/", 1)[-1]
+        character.response = None
+        character.parsed = None
+        character.infobox = None
+        character.name = data.get("name")
+        for field in cls.fields:
+            character.__dict__[field] = data.get(field)
+        return character
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, format: str = "json"):
+        """
+        Rebuilds a character encoded with to_bytes, without fetching or parsing its page.
+
+        Parameters:
+        - payload (bytes): The encoded data.
+        - format (str): "json" or "msgpack".
+
+        Returns:
+        - CharacterStructure: The rebuilt character.
+        """
+        return cls.from_dict(helpers.serial.loads(payload, format))
+
     def __str__(self) -> str:
         """
         Returns a string representation of the character.
@@ -80,14 +505,18 @@ class CharacterStructure:
         Returns:
         - The value associated with the given key.
         """
+        if key in self.fields:
+            return getattr(self, key)
         return self.__dict__[key]
 
     def __iter__(self):
         """
-        Iterates over the character's attributes.
+        Iterates over the character's attributes, extracting every lazy field.
 
         Yields:
         - Tuple[str, Any]: A tuple containing the attribute name and its value.
         """
-        for key, value in self.__dict__.items():
-            yield key, value
+        self.load_fields()
+        for key, value in list(self.__dict__.items()):
+            if key not in ("_lock", "trace", "revision"):
+                yield key, value
@@ -1,12 +1,23 @@
 """Character class that represents a character in the Lord of the Mysteries."""
 
+import itertools
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mystic.helpers as helpers
 from mystic import objectStructures
 
+LoadError = namedtuple("LoadError", ["name", "error"])
+LoadError.__doc__ = (
+    "A record of a character that could not be loaded, with the raised error."
+)
+
 
 class Character(objectStructures.CharacterStructure):
     """
     A class that represents a character in the Lord of the Mysteries.
     Inherits from the CharacterStructure class in the objectStructures module.
+    Every attribute but the name is extracted from the page on first access, then memoized.
 
     Attributes:
     name (str): The name of the character.
@@ -36,40 +47,112 @@ class Character(objectStructures.CharacterStructure):
     symbol: The symbol of the character.
     """
 
-    def __init__(self, name: str) -> None:
+    cache = helpers.memo.LRUCache(maxsize=256, ttl=3600)
+
+    chinese_name = objectStructures.LazyField("get_chinese_name")
+    birth = objectStructures.LazyField("get_birth")
+    gender = objectStructures.LazyField("get_gender")
+    species = objectStructures.LazyField("get_species")
+    height = objectStructures.LazyField("get_height")
+    eye_colour = objectStructures.LazyField("get_eye_colour")
+    hair_colour = objectStructures.LazyField("get_hair_colour")
+    aliases = objectStructures.LazyField("get_aliases")
+    titles = objectStructures.LazyField("get_titles")
+    pathways = objectStructures.LazyField("get_pathways")
+    authorities = objectStructures.LazyField("get_authorities")
+    relatives = objectStructures.LazyField("get_relatives")
+    masters = objectStructures.LazyField("get_masters")
+    enemies = objectStructures.LazyField("get_enemies")
+    allies = objectStructures.LazyField("get_allies")
+    image = objectStructures.LazyField("get_image")
+    affliation = objectStructures.LazyField("get_affliation")
+    occupation = objectStructures.LazyField("get_occupation")
+    religion = objectStructures.LazyField("get_religion")
+    residence = objectStructures.LazyField("get_residence")
+    origin = objectStructures.LazyField("get_origin")
+    intro = objectStructures.LazyField("get_intro")
+    honorific_name = objectStructures.LazyField("get_honorific_name")
+    symbol = objectStructures.LazyField("get_symbol")
+
+    def __init__(
+        self, name: str, client=None, response=None, url_name: str = None
+    ) -> None:
         """
         Initializes a new instance of the Character class.
 
         Parameters:
         name (str): The name of the character.
+        client (Client): The HTTP client to fetch the page with. Defaults to the shared client.
+        response (requests.Response): An already fetched page of the character. Skips the fetch when given.
+        url_name (str): The URL name of the page, used as is, e.g. from a title of the API. Formatted from the name if None.
+        """
+
+        super().__init__(name, client, response, url_name)
+
+    @classmethod
+    def cached(cls, name: str, client=None) -> "Character":
+        """
+        Returns the character from the in-process cache, building and caching it on a miss.
+
+        Entries are keyed by the formatted URL name, bounded in number and expire after the TTL of Character.cache.
+
+        Parameters:
+        name (str): The name of the character.
+        client (Client): The HTTP client to fetch the page with on a miss. Defaults to the shared client.
+
+        Returns:
+        Character: The cached or newly built character.
+        """
+
+        return cls.cache.get_or_create(
+            helpers.misc.format_name(name), lambda: cls(name, client)
+        )
+
+    @classmethod
+    def invalidate(cls, name: str = None) -> None:
+        """
+        Removes a character from the in-process cache, or every character if no name is given.
+
+        Parameters:
+        name (str): The name of the character.
+        """
+
+        if name is None:
+            cls.cache.clear()
+        else:
+            cls.cache.invalidate(helpers.misc.format_name(name))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Character":
+        """
+        Rebuilds a character from its data, without fetching or parsing its page.
+
+        Parameters:
+        data (dict): The data of the character, as returned by get_data().
+
+        Returns:
+        Character: The rebuilt character.
         """
 
-        super().__init__(name)
-
-        self.chinese_name = self.get_chinese_name()
-        self.birth = self.get_birth()
-        self.gender = self.get_gender()
-        self.species = self.get_species()
-        self.height = self.get_height()
-        self.eye_colour = self.get_eye_colour()
-        self.hair_colour = self.get_hair_colour()
-        self.aliases = self.get_aliases()
-        self.titles = self.get_titles()
-        self.pathways = self.get_pathways()
-        self.authorities = self.get_authorities()
-        self.relatives = self.get_relatives()
-        self.masters = self.get_masters()
-        self.enemies = self.get_enemies()
-        self.allies = self.get_allies()
-        self.image = self.get_image()
-        self.affliation = self.get_affliation()
-        self.occupation = self.get_occupation()
-        self.religion = self.get_religion()
-        self.residence = self.get_residence()
-        self.origin = self.get_origin()
-        self.intro = self.get_intro()
-        self.honorific_name = self.get_honorific_name()
-        self.symbol = self.get_symbol()
+        character = super().from_dict(data)
+        if character.chinese_name is not None:
+            # Encoders turn the (Chinese Name, English Translation) tuples into lists
+            character.chinese_name = [tuple(pair) for pair in character.chinese_name]
+        return character
+
+    def to_record(self):
+        """
+        Returns a compact, immutable copy of the data of the character, extracting every lazy field.
+
+        The record does not hold the page or its parsed tree, so it takes a fraction of the memory of the character.
+
+        Returns:
+        CharacterRecord: The record of the character.
+        """
+
+        from mystic.objects.record import CharacterRecord
+
+        return CharacterRecord.from_character(self)
 
     def get_name(self) -> str:
         """
@@ -90,8 +173,8 @@ class Character(objectStructures.CharacterStructure):
         """
 
         names = []
-        head = self.parsed.find("h3", string="Chinese")
-        div = head.parent.find("div")
+        field = self.infobox.get("Chinese")
+        div = field.find("div")
 
         children = div.findChildren("span")
 
@@ -114,9 +197,9 @@ class Character(objectStructures.CharacterStructure):
             str: The birth information of the character, or None if not found.
         """
 
-        head = self.parsed.find("h3", string="Birth")
+        field = self.infobox.get("Birth")
         try:
-            return head.parent.find("div").text
+            return field.find("div").text
         except AttributeError:
             return None
 
@@ -128,9 +211,9 @@ class Character(objectStructures.CharacterStructure):
             str: The gender of the character, or None if not found.
         """
 
-        head = self.parsed.find("h3", string="Gender")
+        field = self.infobox.get("Gender")
         try:
-            return head.parent.find("a").text
+            return field.find("a").text
         except AttributeError:
             return None
 
@@ -143,9 +226,9 @@ class Character(objectStructures.CharacterStructure):
         """
 
         species = []
-        head = self.parsed.find("h3", string="Species")
+        field = self.infobox.get("Species")
         try:
-            data = head.parent.find("div")
+            data = field.find("div")
             children = data.findAll("li")
             if len(children) == 0:
                 try:
@@ -171,9 +254,9 @@ class Character(objectStructures.CharacterStructure):
         """
 
         heights = []
-        head = self.parsed.find("h3", string="Height")
+        field = self.infobox.get("Height")
         try:
-            data = head.parent.find("div")
+            data = field.find("div")
             children = data.findAll("li")
             if len(children) == 0:
                 try:
@@ -200,9 +283,9 @@ class Character(objectStructures.CharacterStructure):
         """
 
         eyes = []
-        head = self.parsed.find("h3", string="Eye")
+        field = self.infobox.get("Eye")
         try:
-            data = head.parent.find("div")
+            data = field.find("div")
             children = data.findAll("li")
             if len(children) == 0:
                 try:
@@ -229,9 +312,9 @@ class Character(objectStructures.CharacterStructure):
         """
 
         hairs = []
-        head = self.parsed.find("h3", string="Hair")
+        field = self.infobox.get("Hair")
         try:
-            data = head.parent.find("div")
+            data = field.find("div")
             children = data.findAll("li")
             if len(children) == 0:
                 try:
@@ -258,17 +341,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         aliases = []
-        head = self.parsed.find("h3", string="Aliases")
+        field = self.infobox.get("Aliases")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            aliases.append(head.parent.find("div").text)
+            aliases.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -288,16 +369,18 @@ class Character(objectStructures.CharacterStructure):
         """
 
         titles = []
-        head = self.parsed.find("h3", string="Titles")
+        field = self.infobox.get("Titles")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
         if len(lists) == 0:
-            titles.append(head.parent.find("div"))
+            data = field.find("div")
+            try:
+                return data.text[: data.text.index("[")]
+            except ValueError:
+                titles.append(data.text)
 
         for li in lists:
             s_text = ""
@@ -326,14 +409,12 @@ class Character(objectStructures.CharacterStructure):
         """
 
         pathways = []
-        head = self.parsed.find("h3", string="Pathway(s)")
+        field = self.infobox.get("Pathway(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        for a in head.parent.find_all("a"):
+        for a in field.find_all("a"):
             if not a.text == "":
                 try:
                     a["title"]
@@ -355,14 +436,12 @@ class Character(objectStructures.CharacterStructure):
         """
 
         authorities = []
-        head = self.parsed.find("h3", string="Authorities")
+        field = self.infobox.get("Authorities")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        for a in head.parent.find_all("a"):
+        for a in field.find_all("a"):
             if not a.text == "":
                 try:
                     a["title"]
@@ -386,17 +465,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         relatives = []
-        head = self.parsed.find("h3", string="Relative(s)")
+        field = self.infobox.get("Relative(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            relatives.append(head.parent.find("div").text)
+            relatives.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -417,17 +494,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         masters = []
-        head = self.parsed.find("h3", string="Master(s)")
+        field = self.infobox.get("Master(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            masters.append(head.parent.find("div").text)
+            masters.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -447,17 +522,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         enemies = []
-        head = self.parsed.find("h3", string="Enemie(s)")
+        field = self.infobox.get("Enemie(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            enemies.append(head.parent.find("div").text)
+            enemies.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -477,17 +550,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         allies = []
-        head = self.parsed.find("h3", string="Allies")
+        field = self.infobox.get("Allies")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            return head.parent.find("div").text
+            return field.find("div").text
 
         for li in lists:
             try:
@@ -522,17 +593,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         affliations = []
-        head = self.parsed.find("h3", string="Affiliation(s)")
+        field = self.infobox.get("Affiliation(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            affliations.append(head.parent.find("div").text)
+            affliations.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -553,17 +622,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         occupations = []
-        head = self.parsed.find("h3", string="Occupation(s)")
+        field = self.infobox.get("Occupation(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            occupations.append(head.parent.find("div").text)
+            occupations.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -584,17 +651,15 @@ class Character(objectStructures.CharacterStructure):
         """
 
         religions = []
-        head = self.parsed.find("h3", string="Religion(s)")
+        field = self.infobox.get("Religion(s)")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return None
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            religions.append(head.parent.find("div").text)
+            religions.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -616,17 +681,15 @@ class Character(objectStructures.CharacterStructure):
 
         """
         origins = []
-        head = self.parsed.find("h3", string="Origin")
+        field = self.infobox.get("Origin")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return [None]
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            origins.append(head.parent.find("div").text)
+            origins.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -648,17 +711,15 @@ class Character(objectStructures.CharacterStructure):
 
         """
         residences = []
-        head = self.parsed.find("h3", string="Residence")
+        field = self.infobox.get("Residence")
 
-        try:
-            head.parent
-        except AttributeError:
+        if field is None:
             return [None]
 
-        lists = head.parent.find_all("li")
+        lists = field.find_all("li")
 
         if len(lists) == 0:
-            residences.append(head.parent.find("div").text)
+            residences.append(field.find("div").text)
 
         for li in lists:
             try:
@@ -679,7 +740,9 @@ class Character(objectStructures.CharacterStructure):
             If no intro is found, returns None.
 
         """
-        intros = self.parsed.find_all("p")[7:12]
+        # Paragraphs are counted within the article body, so that the site chrome, parsed or not, never shifts them
+        body = self.parsed.find(class_="mw-parser-output") or self.parsed
+        intros = body.find_all("p")[7:12]
         poem_divs = self.parsed.find_all("div", class_="poem")
         poem_ps = [p for div in poem_divs for p in div.find_all("p")]
 
@@ -721,9 +784,234 @@ class Character(objectStructures.CharacterStructure):
             An image representing the symbol of mysticism of the character.
         """
         try:
-            symbol = self.parsed.find("h2", string="Mysticism")
-            symbols = symbol.parent.find("figure", class_="pi-item pi-image")
+            symbols = self.infobox["Mysticism"].find(
+                "figure", class_="pi-item pi-image"
+            )
             symbols = symbols.find("img")["src"]
             return symbols
         except:
             return "The Character does not have a Mysticism Symbol."
+
+
+async def afetch_many(
+    names, concurrency: int = 10, client=None, return_exceptions: bool = False
+) -> list:
+    """
+    Fetches and builds many characters concurrently.
+
+    Parameters:
+    names (Iterable[str]): The names of the characters.
+    concurrency (int): The maximum number of characters being loaded at once.
+    client (AsyncClient): The async HTTP client to fetch the pages with. Defaults to the shared async client.
+    return_exceptions (bool): Whether to return the errors of failed names in place of raising the first one.
+
+    Returns:
+    list[Character]: The characters, in the order of the names.
+    """
+
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(name):
+        async with semaphore:
+            return await Character.afetch(name, client)
+
+    return await asyncio.gather(
+        *(fetch(name) for name in names), return_exceptions=return_exceptions
+    )
+
+
+def iter_characters(
+    names,
+    workers: int = 8,
+    max_in_flight: int = None,
+    client=None,
+    return_exceptions: bool = False,
+):
+    """
+    Loads many characters on a thread pool and yields each one as soon as it is built.
+
+    At most max_in_flight names are being loaded at once, so memory stays flat however many names are given.
+
+    Parameters:
+    names (Iterable[str]): The names of the characters. Consumed lazily.
+    workers (int): The number of worker threads.
+    max_in_flight (int): The maximum number of pages being loaded at once. Defaults to twice the workers.
+    client (Client): The HTTP client to fetch the pages with. Defaults to the shared client.
+    return_exceptions (bool): Whether to yield a LoadError for failed names in place of raising the first error.
+
+    Yields:
+    Character | LoadError: The characters, in completion order.
+    """
+
+    max_in_flight = max_in_flight or workers * 2
+    names = iter(names)
+    pending = {}
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="mystic-loader"
+    ) as executor:
+        try:
+            while True:
+                for name in itertools.islice(names, max_in_flight - len(pending)):
+                    pending[executor.submit(Character.fetch, name, client)] = name
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield future.result()
+                    elif return_exceptions:
+                        yield LoadError(name, error)
+                    else:
+                        raise error
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def fetch_batch(
+    names,
+    batch_size: int = 50,
+    workers: int = 8,
+    client=None,
+    return_exceptions: bool = False,
+    source: str = "html",
+) -> list:
+    """
+    Loads many characters, resolving all of their names through batched MediaWiki API queries first.
+
+    One query per batch of names follows redirects and finds the missing pages. With the "html" source, only the
+    existing pages are then fetched, each of them once however many names redirect to it. With the "wikitext"
+    source, the same queries also return the wikitext of the pages, which is extracted as by iter_dump: 500
+    characters take 10 requests rather than 510, though fields are read from the wikitext rather than the
+    rendered page, so their formatting can differ slightly.
+
+    Parameters:
+    names (Iterable[str]): The names of the characters.
+    batch_size (int): The number of names resolved per API query, at most 50.
+    workers (int): The number of threads fetching and extracting the pages. Unused with the "wikitext" source.
+    client (Client): The HTTP client to query the API and fetch the pages with. Defaults to the shared client.
+    return_exceptions (bool): Whether to return a LoadError for failed names in place of raising the first error.
+    source (str): "html" to fetch and parse each rendered page, or "wikitext" to extract the answers of the API.
+
+    Returns:
+    list[Character | LoadError]: The characters, in the order of the names, with the Page of their latest revision.
+
+    Raises:
+    NotFoundError: If a name has no page on the wiki, unless return_exceptions is set.
+    """
+
+    if source not in ("html", "wikitext"):
+        raise ValueError(f"Unknown source {source!r}, expected 'html' or 'wikitext'.")
+
+    client = client or helpers.client.get_client()
+    names = list(names)
+    api = helpers.api.WikiAPI(client)
+
+    if source == "wikitext":
+        entries = api.contents(names, batch_size)
+        pages = {
+            name: None if entry is None else entry[0] for name, entry in entries.items()
+        }
+        loaded = {}
+        for entry in entries.values():
+            if entry is not None and entry[0].title not in loaded:
+                loaded[entry[0].title] = _from_wikitext(*entry, client.base_url)
+    else:
+        pages = api.resolve(names, batch_size)
+        titles = {page.title for page in pages.values() if page is not None}
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="mystic-loader"
+        ) as executor:
+            futures = {
+                title: executor.submit(Character.fetch, title, client)
+                for title in titles
+            }
+        loaded = {
+            title: future.exception() or future.result()
+            for title, future in futures.items()
+        }
+
+    results = []
+    for name in names:
+        page = pages[name]
+        if page is None:
+            character = helpers.exceptions.NotFoundError("Character not found.")
+        else:
+            character = loaded[page.title]
+
+        if not isinstance(character, BaseException):
+            character.revision = page
+            results.append(character)
+        elif return_exceptions:
+            results.append(LoadError(name, character))
+        else:
+            raise character
+
+    return results
+
+
+def _from_wikitext(page, text: str, base_url: str):
+    """
+    Builds a character from the wikitext of its page, as returned by WikiAPI.contents.
+
+    Parameters:
+    page (Page): The page.
+    text (str): The wikitext of its latest revision.
+    base_url (str): The wiki URL that page names are appended to.
+
+    Returns:
+    Character | Exception: The character, or the error raised while extracting it. A page without a character
+    infobox gives a NotFoundError, as its rendered page fails to load.
+    """
+    from mystic.objects import dump
+
+    try:
+        data = dump.extract({"title": page.title, "text": text}, base_url)
+        if data is None:
+            raise helpers.exceptions.NotFoundError(f"{page.title} is not a character.")
+        return Character.from_dict(data)
+    except Exception as error:
+        return error
+
+
+def encode_many(characters, format: str = "json") -> bytes:
+    """
+    Encodes many characters into one buffer: JSON Lines, or a stream of MessagePack maps.
+
+    Parameters:
+    characters (Iterable[Character | CharacterRecord | dict]): The characters, or the dicts of their get_data().
+    format (str): "json" or "msgpack". The msgpack format requires the msgpack package.
+
+    Returns:
+    bytes: The encoded characters.
+    """
+
+    return helpers.serial.dumps_many(
+        (
+            character if isinstance(character, dict) else character.get_data()
+            for character in characters
+        ),
+        format,
+    )
+
+
+def decode_many(payload: bytes, format: str = "json"):
+    """
+    Rebuilds the characters encoded with encode_many, without fetching or parsing their pages.
+
+    Parameters:
+    payload (bytes): The encoded characters.
+    format (str): "json" or "msgpack".
+
+    Yields:
+    Character: The rebuilt characters, in order.
+    """
+
+    for data in helpers.serial.loads_many(payload, format):
+        yield Character.from_dict(data)
@@ -0,0 +1,237 @@
+"""Resumable crawler that discovers and loads every character of the wiki."""
+
+import json
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote, unquote, urljoin, urlsplit
+
+import bs4
+
+import mystic.helpers as helpers
+from mystic.objects.character import Character, LoadError
+
+START_CATEGORIES = ("Category:Characters",)
+
+
+class Crawler:
+    """
+    Walks the character category pages of the wiki, following their pagination, and loads every member page.
+
+    Progress is checkpointed to a JSON file, so that an interrupted crawl resumes without loading finished pages again.
+    """
+
+    def __init__(
+        self,
+        checkpoint: str = None,
+        categories=START_CATEGORIES,
+        client=None,
+        workers: int = 8,
+        max_in_flight: int = None,
+        subcategories: bool = True,
+        checkpoint_every: int = 25,
+        retry_failed: bool = True,
+    ):
+        """
+        Initializes a Crawler object.
+
+        Parameters:
+        checkpoint (str): The path of the checkpoint file. Progress is not saved if None.
+        categories (Iterable[str]): The category pages to start from.
+        client (Client): The HTTP client to fetch the pages with. Defaults to the shared client.
+        workers (int): The number of threads loading character pages.
+        max_in_flight (int): The maximum number of pages being loaded at once. Defaults to twice the workers.
+        subcategories (bool): Whether to also walk the subcategories of the category pages.
+        checkpoint_every (int): The number of finished pages between two checkpoints.
+        retry_failed (bool): Whether to load the pages that failed again on resume. Missing pages are never retried.
+        """
+        self.checkpoint = checkpoint
+        self.client = client or helpers.client.get_client()
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self.subcategories = subcategories
+        self.checkpoint_every = checkpoint_every
+        self.retry_failed = retry_failed
+
+        self.categories = deque(categories)
+        self.visited_categories = set()
+        self.frontier = deque()
+        self.seen = set()
+        self.done = set()
+        self.failed = {}
+        self.missing = set()
+
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load()
+
+    def load(self):
+        """Restores the progress saved in the checkpoint file."""
+        with open(self.checkpoint, encoding="utf-8") as file:
+            state = json.load(file)
+
+        self.categories = deque(state["categories"])
+        self.visited_categories = set(state["visited_categories"])
+        self.done = set(state["done"])
+        self.failed = state["failed"]
+        self.missing = set(state.get("missing", ()))
+        self.frontier = deque(state["frontier"])
+        if self.retry_failed:
+            # Pages that failed on a temporary error, e.g. a timeout, are queued again
+            for name in list(self.failed):
+                if name not in self.missing:
+                    del self.failed[name]
+                    self.frontier.append(name)
+        self.seen = self.done | set(self.failed) | set(self.frontier)
+
+    def save(self, in_flight=()):
+        """
+        Writes the progress to the checkpoint file, atomically.
+
+        Parameters:
+        in_flight (Iterable[str]): The pages being loaded, saved back into the frontier.
+        """
+        if self.checkpoint is None:
+            return
+
+        state = {
+            "categories": list(self.categories),
+            "visited_categories": sorted(self.visited_categories),
+            "frontier": list(in_flight) + list(self.frontier),
+            "done": sorted(self.done),
+            "failed": self.failed,
+            "missing": sorted(self.missing),
+        }
+        directory = os.path.dirname(os.path.abspath(self.checkpoint))
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temporary, self.checkpoint)
+
+    def page_name(self, href: str) -> str:
+        """
+        Returns the page name a link of the wiki points to, or None if it points elsewhere.
+
+        Parameters:
+        href (str): The link.
+
+        Returns:
+        str: The page name, e.g. "Klein_Moretti".
+        """
+        url = urljoin(self.client.base_url, href)
+        base = urlsplit(self.client.base_url)
+        parts = urlsplit(url)
+        if parts.netloc != base.netloc or not parts.path.startswith(base.path):
+            return None
+        return unquote(parts.path[len(base.path) :]) or None
+
+    def walk_category(self, category: str):
+        """
+        Reads a category page, queues its member pages and subcategories and follows its pagination.
+
+        Parameters:
+        category (str): The page name of the category, possibly with a query string for later pages.
+        """
+        response = self.client.get(self.client.base_url + category)
+        if response.status_code != 200:
+            return
+        parsed = bs4.BeautifulSoup(response.text, Character.parser)
+
+        links = parsed.select("a.category-page__member-link") or parsed.select(
+            "#mw-pages a, #mw-subcategories a"
+        )
+        for link in links:
+            name = self.page_name(link.get("href", ""))
+            if name is None:
+                continue
+            if name.startswith("Category:"):
+                if self.subcategories and name not in self.visited_categories:
+                    self.categories.append(name)
+            elif ":" not in name and name not in self.seen:
+                self.seen.add(name)
+                self.frontier.append(name)
+
+        following = parsed.select_one("a.category-page__pagination-next")
+        if following is not None and following.get("href"):
+            query = urlsplit(urljoin(self.client.base_url, following["href"])).query
+            page = category.split("?")[0] + "?" + query
+            if page not in self.visited_categories:
+                self.categories.appendleft(page)
+
+    def load_page(self, name: str) -> Character:
+        """
+        Loads the character of a page, fetching it by its exact page name.
+
+        Parameters:
+        name (str): The page name, e.g. "Klein_Moretti", as returned by page_name.
+
+        Returns:
+        Character: The character with all of its fields extracted.
+        """
+        # Page names are unquoted, and may hold characters such as "?" or "#" that would end the path
+        url_name = quote(name, safe="/:()'")
+        response = self.client.get(self.client.base_url + url_name)
+        character = Character(
+            name.replace("_", " "), self.client, response, url_name=url_name
+        )
+        character.load_fields()
+        return character
+
+    def crawl(self):
+        """
+        Crawls the wiki, yielding every character as soon as it is loaded.
+
+        A page counts as finished once the caller has received its character, so that it is not loaded again
+        on resume.
+
+        Yields:
+        Character | LoadError: The characters, in completion order, and a LoadError for each page that failed.
+        """
+        pending = {}
+        # Yielded to the caller, but not yet known to be handled by it
+        unacknowledged = []
+        finished = 0
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="mystic-crawler"
+        ) as executor:
+            try:
+                while True:
+                    while len(self.frontier) < self.max_in_flight and self.categories:
+                        category = self.categories.popleft()
+                        if category not in self.visited_categories:
+                            try:
+                                self.walk_category(category)
+                            except BaseException:
+                                # Keep the category in the checkpoint, to walk it again on resume
+                                self.categories.appendleft(category)
+                                raise
+                            self.visited_categories.add(category)
+
+                    while len(pending) < self.max_in_flight and self.frontier:
+                        name = self.frontier.popleft()
+                        pending[executor.submit(self.load_page, name)] = name
+                    if not pending:
+                        break
+
+                    completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in completed:
+                        name = pending.pop(future)
+                        error = future.exception()
+                        if error is None:
+                            unacknowledged.append(name)
+                            yield future.result()
+                            unacknowledged.remove(name)
+                            self.done.add(name)
+                        else:
+                            self.failed[name] = repr(error)
+                            if isinstance(error, helpers.exceptions.NotFoundError):
+                                self.missing.add(name)
+                            yield LoadError(name, error)
+
+                        finished += 1
+                        if finished % self.checkpoint_every == 0:
+                            self.save(pending.values())
+            finally:
+                for future in pending:
+                    future.cancel()
+                self.save(unacknowledged + list(pending.values()))
@@ -0,0 +1,232 @@
+"""Offline ingestion of characters from a Special:Export or database XML dump of the wiki."""
+
+import bz2
+import gzip
+import hashlib
+import re
+import xml.etree.ElementTree as ElementTree
+from urllib.parse import quote
+
+from mystic.helpers import wikitext
+from mystic.helpers.misc import WEB_URL
+
+# The infobox templates of character pages
+CHARACTER_TEMPLATE = re.compile(
+    r"(?i)^(character|character[ _]infobox|infobox[ _]character)$"
+)
+
+# The infobox parameters each field of a character is read from, by order of preference
+FIELD_PARAMETERS = {
+    "chinese_name": ("chinese", "chinese name"),
+    "birth": ("birth", "born", "birthday"),
+    "gender": ("gender", "sex"),
+    "species": ("species", "race"),
+    "height": ("height",),
+    "eye_colour": ("eye", "eyes", "eye colour", "eye color"),
+    "hair_colour": ("hair", "hair colour", "hair color"),
+    "aliases": ("aliases", "alias"),
+    "titles": ("titles", "title"),
+    "pathways": ("pathways", "pathway", "pathway(s)"),
+    "authorities": ("authorities", "authority"),
+    "relatives": ("relatives", "relative(s)", "family"),
+    "masters": ("masters", "master(s)", "master"),
+    "enemies": ("enemies", "enemie(s)", "enemy"),
+    "allies": ("allies", "ally"),
+    "image": ("image",),
+    "affliation": ("affiliation", "affiliation(s)", "affiliations"),
+    "occupation": ("occupation", "occupation(s)", "occupations"),
+    "religion": ("religion", "religion(s)"),
+    "residence": ("residence",),
+    "origin": ("origin",),
+    "symbol": ("symbol", "mysticism"),
+}
+
+# The fields holding a single value rather than a list
+SCALAR_FIELDS = ("birth", "gender", "image", "symbol")
+# The fields holding a single value unless they are written as a bulleted list, as read from the rendered page
+SINGLE_OR_LIST_FIELDS = ("species", "height", "eye_colour", "hair_colour", "titles")
+BULLET = re.compile(r"^\s*[*#]", re.M)
+
+# The values the getters of Character give to the fields missing from the page
+MISSING_VALUES = {
+    "image": "No Image exists yet.",
+    "residence": [None],
+    "origin": [None],
+    "symbol": "The Character does not have a Mysticism Symbol.",
+}
+
+# The URL files uploaded to the wiki are served from
+IMAGE_URL = "https://static.wikia.nocookie.net/lord-of-the-mystery/images/"
+FILE_PREFIX = re.compile(r"(?i)^(file|image):")
+
+
+def open_dump(path):
+    """
+    Opens a dump for reading, decompressing .gz and .bz2 files on the fly.
+
+    Parameters:
+    path (str): The path of the dump.
+
+    Returns:
+    file: The binary file object of the dump.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def iter_pages(source):
+    """
+    Streams the pages of a dump, holding only one page in memory at a time.
+
+    Parameters:
+    source (str | file): The path or the binary file object of the dump.
+
+    Yields:
+    dict: The title, namespace, revision ID, timestamp and wikitext of each page.
+    """
+    file = open_dump(source) if isinstance(source, str) else source
+    try:
+        root = None
+        for event, element in ElementTree.iterparse(file, events=("start", "end")):
+            tag = element.tag.rpartition("}")[2]
+            if event == "start":
+                if root is None:
+                    root = element
+                continue
+            if tag != "page":
+                continue
+
+            page = {
+                "title": None,
+                "ns": 0,
+                "revid": None,
+                "timestamp": None,
+                "text": "",
+            }
+            for child in element.iter():
+                name = child.tag.rpartition("}")[2]
+                if name == "title":
+                    page["title"] = child.text
+                elif name == "ns":
+                    page["ns"] = int(child.text or 0)
+                elif name == "revision":
+                    for field in child:
+                        field_name = field.tag.rpartition("}")[2]
+                        if field_name == "id":
+                            page["revid"] = int(field.text)
+                        elif field_name == "timestamp":
+                            page["timestamp"] = field.text
+                        elif field_name == "text":
+                            page["text"] = field.text or ""
+            yield page
+
+            # Drop the parsed page so that memory stays flat however large the dump is
+            root.clear()
+    finally:
+        if isinstance(source, str):
+            file.close()
+
+
+def file_url(name: str) -> str:
+    """
+    Returns the URL a file of the wiki is served from, as the rendered pages link their images.
+
+    Parameters:
+    name (str): The name of the file, e.g. "Fors Wall.png", with or without its "File:" prefix.
+
+    Returns:
+    str: The URL of the latest version of the file.
+    """
+    name = FILE_PREFIX.sub("", name.strip()).replace(" ", "_")
+    name = name[:1].upper() + name[1:]
+    # MediaWiki spreads the uploads over directories named after the MD5 digest of their name
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return f"{IMAGE_URL}{digest[0]}/{digest[:2]}/{quote(name)}/revision/latest"
+
+
+def extract(page, base_url: str = WEB_URL, template=CHARACTER_TEMPLATE) -> dict:
+    """
+    Extracts the fields of a character from the wikitext of its page.
+
+    Fields take the values the getters of Character read from the rendered page, missing ones included. The intro
+    is the first paragraphs of prose, where the getter reads paragraphs at fixed positions of the rendered page.
+
+    Parameters:
+    page (dict): A page as yielded by iter_pages.
+    base_url (str): The wiki URL that page names are appended to.
+    template (re.Pattern): The names of the infobox templates of character pages.
+
+    Returns:
+    dict: The data of the character with the keys of Character.get_data(), or None if the page is not a character.
+    """
+    text = page["text"]
+    infobox = None
+    for name, parameters, _, end in wikitext.find_templates(text):
+        if template.match(name):
+            infobox = parameters
+            body = text[end:]
+            break
+    if infobox is None:
+        return None
+
+    url_name = page["title"].replace(" ", "_")
+    data = {
+        "url": base_url + url_name,
+        "name": wikitext.clean(infobox.get("name", "")) or page["title"],
+    }
+
+    for field, keys in FIELD_PARAMETERS.items():
+        value = next((infobox[key] for key in keys if infobox.get(key)), None)
+        if value is None:
+            data[field] = None
+        elif field in SCALAR_FIELDS or (
+            field in SINGLE_OR_LIST_FIELDS and not BULLET.search(value)
+        ):
+            data[field] = wikitext.clean(value)
+        else:
+            data[field] = wikitext.clean_list(value)
+
+    for field in ("image", "symbol"):
+        if data[field]:
+            data[field] = file_url(data[field])
+    for field, missing in MISSING_VALUES.items():
+        if data[field] is None:
+            data[field] = list(missing) if isinstance(missing, list) else missing
+
+    names = data["chinese_name"] or []
+    data["chinese_name"] = list(zip(names[0::2], names[1::2]))
+
+    paragraphs = [
+        wikitext.clean(paragraph)
+        for paragraph in wikitext.POEM.sub("", body).split("\n\n")
+        if paragraph.strip() and paragraph.strip()[0] not in "{|=[*#_<"
+    ]
+    data["intro"] = [paragraph for paragraph in paragraphs if paragraph][:5]
+    poems = wikitext.find_poems(body)
+    data["honorific_name"] = poems[1:2] or poems[0:1]
+    data["symbol"] = data.pop("symbol")
+
+    return data
+
+
+def iter_dump(source, base_url: str = WEB_URL, template=CHARACTER_TEMPLATE):
+    """
+    Streams the characters of a dump without any network access.
+
+    Parameters:
+    source (str | file): The path or the binary file object of the dump.
+    base_url (str): The wiki URL that page names are appended to.
+    template (re.Pattern): The names of the infobox templates of character pages.
+
+    Yields:
+    dict: The data of each character with the keys of Character.get_data().
+    """
+    for page in iter_pages(source):
+        if page["ns"] != 0 or page["title"] is None:
+            continue
+        data = extract(page, base_url, template)
+        if data is not None:
+            yield data
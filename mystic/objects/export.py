@@ -0,0 +1,178 @@
+"""Bulk export of characters to JSON Lines or CSV, streamed as they are loaded."""
+
+import csv
+import io
+import json
+import time
+from collections import defaultdict, deque, namedtuple
+
+import mystic.helpers as helpers
+from mystic.objects.character import LoadError, iter_characters
+from mystic.objects.record import RECORD_FIELDS
+
+EXPORT_FORMATS = ("jsonl", "csv")
+
+# The number of seconds between two progress reports
+PROGRESS_INTERVAL = 2.0
+
+ExportResult = namedtuple("ExportResult", ["written", "failed", "seconds"])
+ExportResult.__doc__ = (
+    "The outcome of an export: the number of characters written, the LoadError of each name that failed to load, "
+    "extract or encode, and the time taken."
+)
+
+
+def read_names(file):
+    """
+    Reads names from a file, one per line, skipping blank lines and # comments.
+
+    Parameters:
+    file (file): The text file object of the names.
+
+    Yields:
+    str: Each name, in order.
+    """
+    for line in file:
+        name = line.strip()
+        if name and not name.startswith("#"):
+            yield name
+
+
+def csv_row(data: dict) -> dict:
+    """
+    Flattens the data of a character for CSV: list fields are encoded as JSON, and missing fields are empty.
+
+    Parameters:
+    data (dict): The data of the character.
+
+    Returns:
+    dict: The row of the character.
+    """
+    return {
+        field: (
+            json.dumps(value, ensure_ascii=False)
+            if isinstance(value, (list, tuple))
+            else value
+        )
+        for field, value in data.items()
+    }
+
+
+def export(
+    names,
+    output,
+    format: str = "jsonl",
+    workers: int = 8,
+    max_in_flight: int = None,
+    client=None,
+    failures=None,
+    progress=None,
+) -> ExportResult:
+    """
+    Loads many characters in parallel and writes each one to the output as soon as it is extracted.
+
+    At most max_in_flight characters are loaded or waiting to be written at once, so memory stays flat however
+    many names are given. Records are written in completion order and flushed one by one.
+
+    Parameters:
+    names (Iterable[str]): The names of the characters. Consumed lazily.
+    output (file): The text file object to write to.
+    format (str): "jsonl" for JSON Lines, or "csv" with a header of RECORD_FIELDS.
+    workers (int): The number of threads fetching and extracting the pages.
+    max_in_flight (int): The maximum number of pages being loaded at once. Defaults to twice the workers.
+    client (Client): The HTTP client to fetch the pages with. Defaults to the shared client.
+    failures (file): A text file object each name that failed to load, extract or encode is logged to, with its
+    error, tab-separated.
+    progress (file): A text file object the progress and throughput are reported to, e.g. sys.stderr.
+
+    Returns:
+    ExportResult: The number of characters written and the failures.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown format {format!r}, expected one of {EXPORT_FORMATS}."
+        )
+
+    buffer = io.StringIO(newline="")
+    writer = None
+    if format == "csv":
+        writer = csv.DictWriter(buffer, RECORD_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        output.write(buffer.getvalue())
+
+    def encode(data: dict) -> str:
+        """Encodes the data of a character as one record of the output."""
+        if writer is None:
+            return helpers.serial.dumps(data).decode() + "\n"
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(csv_row(data))
+        return buffer.getvalue()
+
+    # The names being loaded by URL name, so that a failure is reported under the name it was asked by
+    requested = defaultdict(deque)
+
+    def remember(names):
+        for name in names:
+            requested[helpers.misc.format_name(name)].append(name)
+            yield name
+
+    def requested_name(url_name: str) -> str:
+        names = requested[url_name]
+        name = names.popleft()
+        if not names:
+            del requested[url_name]
+        return name
+
+    started = reported = time.perf_counter()
+    written, failed = 0, []
+    for character in iter_characters(
+        remember(names),
+        workers=workers,
+        max_in_flight=max_in_flight,
+        client=client,
+        return_exceptions=True,
+    ):
+        if isinstance(character, LoadError):
+            requested_name(helpers.misc.format_name(character.name))
+        else:
+            name = requested_name(character.url_name)
+            try:
+                line = encode(character.get_data())
+            except Exception as error:
+                # A page that cannot be extracted or encoded must not stop the rest of the export
+                character = LoadError(name, error)
+            else:
+                output.write(line)
+                output.flush()
+                written += 1
+
+        if isinstance(character, LoadError):
+            failed.append(character)
+            if failures is not None:
+                reason = (
+                    "not found"
+                    if isinstance(character.error, helpers.exceptions.NotFoundError)
+                    else repr(character.error)
+                )
+                failures.write(f"{character.name}\t{reason}\n")
+                failures.flush()
+
+        now = time.perf_counter()
+        if progress is not None and now - reported >= PROGRESS_INTERVAL:
+            reported = now
+            report(progress, written, len(failed), now - started)
+
+    seconds = time.perf_counter() - started
+    if progress is not None:
+        report(progress, written, len(failed), seconds)
+    return ExportResult(written, failed, seconds)
+
+
+def report(stream, written: int, failed: int, seconds: float):
+    """Writes a progress line: the characters written and failed, and the throughput."""
+    rate = (written + failed) / seconds if seconds else 0.0
+    stream.write(
+        f"{written} written, {failed} failed in {seconds:.1f}s ({rate:.1f} names/s)\n"
+    )
+    stream.flush()
@@ -0,0 +1,240 @@
+"""Graph of the relationships between characters, with traversal queries."""
+
+import re
+from array import array
+from collections import deque
+
+# The types of relationship, by the field of a character they are read from
+RELATIONS = {
+    "relatives": "relative",
+    "masters": "master",
+    "enemies": "enemy",
+    "allies": "ally",
+}
+RELATION_TYPES = tuple(RELATIONS.values())
+
+NOTES = re.compile(r"\([^)]*\)|\[[^\]]*\]|†")
+
+
+def clean_name(text: str) -> str:
+    """
+    Strips the notes of a relationship entry, e.g. "Benson Moretti (Elder Brother)" becomes "Benson Moretti".
+
+    Parameters:
+    text (str): The entry.
+
+    Returns:
+    str: The name of the related character.
+    """
+    return " ".join(NOTES.sub(" ", text).split())
+
+
+class RelationGraph:
+    """
+    An undirected graph of characters with typed edges (relative, master, enemy, ally).
+
+    Names are mapped to integer node IDs, and the neighbours of each node are kept in compact arrays of IDs and types.
+    """
+
+    def __init__(self):
+        """Initializes an empty RelationGraph object."""
+        self.ids = {}
+        self.names = []
+        self._targets = []
+        self._types = []
+
+    @classmethod
+    def from_characters(cls, characters) -> "RelationGraph":
+        """
+        Builds the graph of many characters.
+
+        Parameters:
+        characters (Iterable[Character | dict]): The characters, or the dicts of their get_data().
+
+        Returns:
+        RelationGraph: The graph of their relationships.
+        """
+        graph = cls()
+        for character in characters:
+            graph.add(character)
+        return graph
+
+    def node(self, name: str) -> int:
+        """
+        Returns the ID of a character, adding it to the graph if needed.
+
+        Parameters:
+        name (str): The name of the character.
+
+        Returns:
+        int: The node ID of the character.
+        """
+        name = clean_name(name)
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            self._targets.append(array("I"))
+            self._types.append(array("B"))
+        return self.ids[name]
+
+    def connect(self, source: str, target: str, relation: str):
+        """
+        Adds an edge between two characters, unless it already exists.
+
+        Parameters:
+        source (str): The name of the first character.
+        target (str): The name of the second character.
+        relation (str): The type of the relationship, one of RELATION_TYPES.
+        """
+        kind = RELATION_TYPES.index(relation)
+        first, second = self.node(source), self.node(target)
+        if first == second:
+            return
+
+        # Characters have few relationships, so the neighbours of the least connected end are scanned in place
+        # of keeping a set of every edge
+        end, other = (
+            (first, second)
+            if len(self._targets[first]) <= len(self._targets[second])
+            else (second, first)
+        )
+        for target, existing in zip(self._targets[end], self._types[end]):
+            if target == other and existing == kind:
+                return
+
+        self._targets[first].append(second)
+        self._types[first].append(kind)
+        self._targets[second].append(first)
+        self._types[second].append(kind)
+
+    def add(self, character):
+        """
+        Adds a character and its relationships to the graph.
+
+        Parameters:
+        character (Character | dict): The character, or the dict of its get_data().
+        """
+        data = character if isinstance(character, dict) else character.get_data()
+        name = data["name"]
+        self.node(name)
+        for field, relation in RELATIONS.items():
+            entries = data.get(field) or []
+            if isinstance(entries, str):
+                entries = [entries]
+            for entry in entries:
+                entry = clean_name(entry)
+                if entry.startswith("Unnamed"):
+                    # Unnamed relatives of different characters are different people
+                    entry = f"{entry} of {clean_name(name)}"
+                if entry:
+                    self.connect(name, entry, relation)
+
+    def neighbours(self, node: int, relations=None):
+        """
+        Yields the neighbours of a node.
+
+        Parameters:
+        node (int): The node ID.
+        relations (Iterable[str]): The types of relationship to follow. Every type if None.
+
+        Yields:
+        tuple[int, str]: The node ID of each neighbour with the type of the relationship.
+        """
+        kinds = None
+        if relations is not None:
+            kinds = {RELATION_TYPES.index(relation) for relation in relations}
+        for target, kind in zip(self._targets[node], self._types[node]):
+            if kinds is None or kind in kinds:
+                yield target, RELATION_TYPES[kind]
+
+    def _bfs(self, start: int, relations=None, depth: int = None) -> dict:
+        """Returns the parent of every node reachable from start, within depth hops, as {node: (parent, hops)}."""
+        kinds = None
+        if relations is not None:
+            kinds = {RELATION_TYPES.index(relation) for relation in relations}
+
+        visited = {start: (None, 0)}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            hops = visited[node][1]
+            if depth is not None and hops >= depth:
+                continue
+            for target, kind in zip(self._targets[node], self._types[node]):
+                if target not in visited and (kinds is None or kind in kinds):
+                    visited[target] = (node, hops + 1)
+                    queue.append(target)
+        return visited
+
+    def shortest_path(self, source: str, target: str, relations=None) -> list[str]:
+        """
+        Finds a shortest chain of relationships between two characters.
+
+        Parameters:
+        source (str): The name of the first character.
+        target (str): The name of the second character.
+        relations (Iterable[str]): The types of relationship to follow. Every type if None.
+
+        Returns:
+        list[str]: The names along the path, both ends included, or None if they are not connected.
+        """
+        start, end = self.ids.get(clean_name(source)), self.ids.get(clean_name(target))
+        if start is None or end is None:
+            return None
+
+        visited = self._bfs(start, relations)
+        if end not in visited:
+            return None
+
+        path = [end]
+        while visited[path[-1]][0] is not None:
+            path.append(visited[path[-1]][0])
+        return [self.names[node] for node in reversed(path)]
+
+    def neighbourhood(self, name: str, hops: int = 1, relations=None) -> dict:
+        """
+        Finds the characters within a number of relationships of a character.
+
+        Parameters:
+        name (str): The name of the character.
+        hops (int): The maximum number of relationships to follow.
+        relations (Iterable[str]): The types of relationship to follow. Every type if None.
+
+        Returns:
+        dict: The name of each character found mapped to its distance, the character itself excluded.
+        """
+        start = self.ids.get(clean_name(name))
+        if start is None:
+            return {}
+        visited = self._bfs(start, relations, hops)
+        return {
+            self.names[node]: distance
+            for node, (_, distance) in visited.items()
+            if node != start
+        }
+
+    def components(self, relations=None) -> list[list[str]]:
+        """
+        Splits the graph into its connected components.
+
+        Parameters:
+        relations (Iterable[str]): The types of relationship to follow. Every type if None.
+
+        Returns:
+        list[list[str]]: The names of the characters of each component, largest first.
+        """
+        seen = set()
+        components = []
+        for node in range(len(self.names)):
+            if node in seen:
+                continue
+            component = self._bfs(node, relations)
+            seen.update(component)
+            components.append([self.names[member] for member in component])
+        return sorted(components, key=len, reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return clean_name(name) in self.ids
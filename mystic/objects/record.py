@@ -0,0 +1,131 @@
+"""Compact, immutable records of extracted characters."""
+
+from mystic.objects.character import Character
+
+# The keys of Character.get_data(), in order
+RECORD_FIELDS = ("url", "name") + Character.fields
+
+
+def freeze(value):
+    """
+    Turns the lists of a field into tuples, recursively, so that the value is immutable and hashable.
+
+    Parameters:
+    value: The value of the field.
+
+    Returns:
+    The frozen value.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class CharacterRecord:
+    """
+    The extracted data of a character, without its page or parsed tree.
+
+    Records are immutable and hashable: list fields are stored as tuples, and attributes cannot be set.
+    They hold the same keys as Character.get_data(), in slots rather than a __dict__.
+    """
+
+    __slots__ = RECORD_FIELDS
+    fields = RECORD_FIELDS
+
+    def __init__(self, **values):
+        """
+        Initializes a CharacterRecord object.
+
+        Parameters:
+        **values: The value of each field. Missing fields are None, and lists are frozen into tuples.
+
+        Raises:
+        TypeError: If a value is given for an unknown field.
+        """
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise TypeError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        for field in self.fields:
+            object.__setattr__(self, field, freeze(values.get(field)))
+
+    @classmethod
+    def from_data(cls, data: dict) -> "CharacterRecord":
+        """
+        Builds a record from the data of a character, ignoring unknown keys.
+
+        Parameters:
+        data (dict): The data of the character, as returned by Character.get_data().
+
+        Returns:
+        CharacterRecord: The record of the character.
+        """
+        return cls(**{field: data.get(field) for field in cls.fields})
+
+    @classmethod
+    def from_character(cls, character: Character) -> "CharacterRecord":
+        """
+        Builds the record of a character, extracting every lazy field.
+
+        Parameters:
+        character (Character): The character.
+
+        Returns:
+        CharacterRecord: The record of the character.
+        """
+        return cls.from_data(character.get_data())
+
+    def get_data(self) -> dict:
+        """
+        Retrieves the data of the record, in the shape of Character.get_data(): list fields are lists again.
+
+        Returns:
+        dict: The data of the character.
+        """
+        return {
+            field: list(value) if isinstance(value, tuple) else value
+            for field, value in zip(self.fields, self._values())
+        }
+
+    def replace(self, **values) -> "CharacterRecord":
+        """
+        Returns a copy of the record with some fields changed.
+
+        Parameters:
+        **values: The new value of each changed field.
+
+        Returns:
+        CharacterRecord: The changed copy.
+        """
+        return type(self)(**{**dict(zip(self.fields, self._values())), **values})
+
+    def _values(self) -> tuple:
+        """Returns the value of every field, in order."""
+        return tuple(getattr(self, field) for field in self.fields)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __getitem__(self, key):
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return zip(self.fields, self._values())
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CharacterRecord):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __reduce__(self):
+        return (type(self).from_data, (self.get_data(),))
+
+    def __repr__(self) -> str:
+        return f"CharacterRecord(name={self.name!r}, url={self.url!r})"
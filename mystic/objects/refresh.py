@@ -0,0 +1,92 @@
+"""Incremental refresh of a Store, re-extracting only the pages revised on the wiki."""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import mystic.helpers as helpers
+from mystic.objects.character import Character, LoadError
+
+RefreshResult = namedtuple(
+    "RefreshResult", ["checked", "changed", "updated", "removed", "failed", "started"]
+)
+RefreshResult.__doc__ = (
+    "The outcome of a refresh: the number of pages checked, the URL names of the revised and of the missing pages, "
+    "the number of characters written, the LoadError of each failed page, and when the refresh started."
+)
+
+
+def refresh(
+    store,
+    client=None,
+    since: str = None,
+    batch_size: int = helpers.api.MAX_TITLES,
+    workers: int = 8,
+    remove_missing: bool = False,
+) -> RefreshResult:
+    """
+    Brings a store up to date with the wiki, fetching only the pages with a newer revision than the stored one.
+
+    The latest revision of every stored page is read with batched API queries, 50 pages per query. With since,
+    only the pages listed in the recent changes since then are checked, along with those without a recorded revision.
+
+    Parameters:
+    store (Store): The store to refresh.
+    client (Client): The HTTP client to query the API and fetch the pages with. Defaults to the shared client.
+    since (str): The ISO 8601 timestamp of the previous refresh, e.g. its RefreshResult.started. Checks every page if None.
+    batch_size (int): The number of pages checked per API query, at most 50.
+    workers (int): The number of threads fetching and extracting the revised pages.
+    remove_missing (bool): Whether to delete the stored characters whose page no longer exists.
+
+    Returns:
+    RefreshResult: What was checked, revised, written, removed and what failed.
+    """
+    started = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    client = client or helpers.client.get_client()
+    api = helpers.api.WikiAPI(client)
+
+    stored = store.revisions()
+    keys = list(stored)
+    if since is not None:
+        titles = api.recent_changes(since)
+        keys = [
+            key
+            for key in keys
+            if key.replace("_", " ") in titles or stored[key][0] is None
+        ]
+
+    # Pages are known by the title their key was taken from, which format_name cannot always give back
+    titles = {key: key.replace("_", " ") for key in keys}
+    pages = api.resolve(titles.values(), batch_size, exact=True)
+
+    changed, removed = [], []
+    for key, title in titles.items():
+        page = pages[title]
+        if page is None:
+            removed.append(key)
+        elif page.revid != stored[key][0]:
+            changed.append(key)
+
+    characters, failed = [], []
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="mystic-loader"
+    ) as executor:
+        futures = {
+            executor.submit(Character.fetch, titles[key], client, key): key
+            for key in changed
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            if future.exception() is not None:
+                failed.append(LoadError(titles[key], future.exception()))
+            else:
+                character = future.result()
+                character.revision = pages[titles[key]]
+                characters.append(character)
+    updated = store.upsert(characters)
+
+    if remove_missing:
+        for key in removed:
+            store.delete(titles[key])
+
+    return RefreshResult(len(keys), changed, updated, removed, failed, started)
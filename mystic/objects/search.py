@@ -0,0 +1,243 @@
+"""In-memory full-text search over the names, aliases, titles and intros of characters."""
+
+import bisect
+import gzip
+import json
+import math
+import re
+import threading
+from collections import namedtuple
+
+TOKEN = re.compile(r"\w+")
+
+# The fields that are searched, with the weight of a term found in each of them
+SEARCH_FIELDS = {
+    "name": 3.0,
+    "aliases": 2.0,
+    "honorific_name": 2.0,
+    "chinese_name": 2.0,
+    "titles": 1.5,
+    "intro": 1.0,
+}
+
+SearchHit = namedtuple("SearchHit", ["name", "url", "score"])
+SearchHit.__doc__ = "A character matching a search, with its BM25 score."
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits a text into lowercase word tokens.
+
+    Parameters:
+    text (str): The text to split.
+
+    Returns:
+    list[str]: The tokens of the text.
+    """
+    return TOKEN.findall(text.lower())
+
+
+def flatten(value) -> list[str]:
+    """
+    Returns the strings of a field, whether it holds a string or (nested) lists and tuples of strings.
+
+    Parameters:
+    value: The value of the field.
+
+    Returns:
+    list[str]: The strings of the field.
+    """
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in flatten(item)]
+    return [str(value)]
+
+
+class SearchIndex:
+    """
+    An inverted index of characters ranked with BM25.
+
+    Characters can be added and removed one by one as they are refreshed, and the index saved to and loaded from disk.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, fields: dict = None):
+        """
+        Initializes a SearchIndex object.
+
+        Parameters:
+        k1 (float): The BM25 term frequency saturation.
+        b (float): The BM25 document length normalization.
+        fields (dict): The searched fields with their weights. Defaults to SEARCH_FIELDS.
+        """
+        self.k1 = k1
+        self.b = b
+        self.fields = dict(fields or SEARCH_FIELDS)
+        self.documents = {}
+        self.postings = {}
+        self._total_length = 0.0
+        self._terms = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(data: dict) -> str:
+        """Returns the key of a character, the URL name at the end of its URL."""
+        return data["url"].rstrip("/").rsplit("/", 1)[-1]
+
+    def add(self, character):
+        """
+        Indexes a character, replacing its previous version if it is already indexed.
+
+        Parameters:
+        character (Character | dict): The character, or the dict of its get_data().
+        """
+        data = character if isinstance(character, dict) else character.get_data()
+        key = self.key(data)
+
+        frequencies = {}
+        for field, weight in self.fields.items():
+            for text in flatten(data.get(field)):
+                for term in tokenize(text):
+                    frequencies[term] = frequencies.get(term, 0.0) + weight
+        length = sum(frequencies.values())
+
+        with self._lock:
+            self.remove(key)
+            self.documents[key] = [
+                data.get("name"),
+                data["url"],
+                length,
+                list(frequencies),
+            ]
+            self._total_length += length
+            for term, frequency in frequencies.items():
+                if term not in self.postings:
+                    self.postings[term] = {}
+                    self._terms = None
+                self.postings[term][key] = frequency
+
+    def remove(self, key: str) -> bool:
+        """
+        Removes a character from the index.
+
+        Parameters:
+        key (str): The URL name of the character.
+
+        Returns:
+        bool: Whether the character was indexed.
+        """
+        with self._lock:
+            document = self.documents.pop(key, None)
+            if document is None:
+                return False
+
+            self._total_length -= document[2]
+            for term in document[3]:
+                del self.postings[term][key]
+                if not self.postings[term]:
+                    del self.postings[term]
+                    self._terms = None
+            return True
+
+    def expand(self, prefix: str) -> list[str]:
+        """
+        Returns the indexed terms starting with a prefix.
+
+        Parameters:
+        prefix (str): The prefix of the terms.
+
+        Returns:
+        list[str]: The matching terms.
+        """
+        with self._lock:
+            if self._terms is None:
+                self._terms = sorted(self.postings)
+            terms = self._terms
+        start = bisect.bisect_left(terms, prefix)
+        end = bisect.bisect_left(terms, prefix + "\U0010ffff")
+        return terms[start:end]
+
+    def search(self, query: str, limit: int = 10, prefix: bool = False) -> list:
+        """
+        Searches the characters matching a query.
+
+        Parameters:
+        query (str): The words to look for, e.g. "Mr. Clown".
+        limit (int): The maximum number of results.
+        prefix (bool): Whether the last word of the query also matches the terms it is a prefix of, for search-as-you-type.
+
+        Returns:
+        list[SearchHit]: The matching characters, best first.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            count = len(self.documents)
+            if count == 0:
+                return []
+            average_length = self._total_length / count or 1.0
+
+            groups = [[term] for term in terms]
+            if prefix:
+                groups[-1] = self.expand(terms[-1]) or groups[-1]
+
+            scores = {}
+            for group in groups:
+                for term in group:
+                    keys = self.postings.get(term, {})
+                    idf = math.log(1 + (count - len(keys) + 0.5) / (len(keys) + 0.5))
+                    for key, frequency in keys.items():
+                        length = self.documents[key][2]
+                        norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                        score = idf * frequency * (self.k1 + 1) / (frequency + norm)
+                        scores[key] = scores.get(key, 0.0) + score
+
+            best = sorted(scores.items(), key=lambda item: -item[1])[:limit]
+            return [
+                SearchHit(self.documents[key][0], self.documents[key][1], score)
+                for key, score in best
+            ]
+
+    def save(self, path: str):
+        """
+        Saves the index to a gzip-compressed JSON file.
+
+        Parameters:
+        path (str): The path of the file.
+        """
+        with self._lock:
+            state = {
+                "k1": self.k1,
+                "b": self.b,
+                "fields": self.fields,
+                "documents": self.documents,
+                "postings": self.postings,
+            }
+            payload = json.dumps(state, ensure_ascii=False, separators=(",", ":"))
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            file.write(payload)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        """
+        Loads an index saved with save.
+
+        Parameters:
+        path (str): The path of the file.
+
+        Returns:
+        SearchIndex: The loaded index, ready to be searched and updated.
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            state = json.load(file)
+
+        index = cls(state["k1"], state["b"], state["fields"])
+        index.documents = state["documents"]
+        index.postings = state["postings"]
+        index._total_length = sum(document[2] for document in index.documents.values())
+        return index
+
+    def __len__(self) -> int:
+        return len(self.documents)
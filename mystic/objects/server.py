@@ -0,0 +1,307 @@
+"""HTTP JSON service for character lookups, with shared caches, snapshots and statistics."""
+
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import mystic.helpers as helpers
+from mystic.objects.character import Character
+
+# The number of most recent requests the latency percentiles are computed over
+LATENCY_WINDOW = 10000
+
+
+class Stats:
+    """Thread-safe counters of the requests served, with their latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Initializes a Stats object.
+
+        Parameters:
+        window (int): The number of most recent requests the latency percentiles are computed over.
+        """
+        self.started = time.monotonic()
+        self.requests = 0
+        self.statuses = {}
+        self.loads = 0
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, status: int, seconds: float):
+        """
+        Counts a request.
+
+        Parameters:
+        status (int): The HTTP status of the response.
+        seconds (float): The time taken to serve the request.
+        """
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self._latencies.append(seconds)
+
+    def count_load(self):
+        """Counts a character loaded from the wiki, i.e. a miss of every cache."""
+        with self._lock:
+            self.loads += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters.
+
+        Returns:
+        dict: The uptime, request and load counts, throughput and latency percentiles in milliseconds.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            uptime = time.monotonic() - self.started
+            stats = {
+                "uptime_seconds": uptime,
+                "requests": self.requests,
+                "requests_per_second": self.requests / uptime if uptime else 0.0,
+                "statuses": {
+                    str(status): count for status, count in self.statuses.items()
+                },
+                "loads": self.loads,
+            }
+
+        if latencies:
+            stats["latency_ms"] = {
+                "mean": sum(latencies) / len(latencies) * 1000,
+                "p50": latencies[int(len(latencies) * 0.50)] * 1000,
+                "p90": latencies[int(len(latencies) * 0.90)] * 1000,
+                "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+                "max": latencies[-1] * 1000,
+            }
+        return stats
+
+
+class CharacterServer(ThreadingHTTPServer):
+    """
+    Serves characters as JSON, each request on its own thread.
+
+    Endpoints:
+    - GET /characters/{name}: The data of a character. ?fields=name,pathways keeps only some fields.
+    - GET /characters/{name}/{field}: A single field of a character.
+    - GET /stats: The request, latency and cache counters.
+    - GET /health: Whether the server is up.
+
+    Characters are cached as their data and encoded body, not as parsed pages, in an LRU cache shared by every
+    request thread. Concurrent misses of the same character share a single load.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple = ("127.0.0.1", 8000),
+        client=None,
+        cache_size: int = 4096,
+        ttl: float = 3600,
+        snapshot: str = None,
+    ):
+        """
+        Initializes a CharacterServer object, preloading the snapshot if it exists.
+
+        Parameters:
+        address (tuple): The (host, port) to listen on. Port 0 picks a free port.
+        client (Client): The HTTP client to fetch the pages with. Defaults to the shared client.
+        cache_size (int): The maximum number of characters kept in memory.
+        ttl (float): The number of seconds a character stays cached. Forever if None.
+        snapshot (str): The path of a file of encode_many JSON Lines, ".msgpack" for MessagePack, to preload.
+        """
+        super().__init__(address, CharacterHandler)
+        self.client = client or helpers.client.get_client()
+        self.cache = helpers.memo.LRUCache(maxsize=cache_size, ttl=ttl)
+        self.stats = Stats()
+        self.snapshot = snapshot
+        if snapshot is not None and os.path.exists(snapshot):
+            self.load_snapshot(snapshot)
+
+    @property
+    def snapshot_format(self) -> str:
+        """The format of the snapshot file, from its extension."""
+        return "msgpack" if self.snapshot.endswith(".msgpack") else "json"
+
+    def load_snapshot(self, path: str) -> int:
+        """
+        Fills the cache with the characters of a snapshot.
+
+        Parameters:
+        path (str): The path of the snapshot.
+
+        Returns:
+        int: The number of characters loaded.
+        """
+        with open(path, "rb") as file:
+            payload = file.read()
+        count = 0
+        for data in helpers.serial.loads_many(payload, self.snapshot_format):
+            self.cache.put(self.key(data), self.entry(data))
+            count += 1
+        return count
+
+    def save_snapshot(self, path: str = None) -> int:
+        """
+        Writes the cached characters to a snapshot, atomically, for the next start to be warm.
+
+        Parameters:
+        path (str): The path of the snapshot. Defaults to the snapshot of the server.
+
+        Returns:
+        int: The number of characters saved.
+        """
+        path = path or self.snapshot
+        items = [data for _, (data, _) in self.cache.items()]
+        payload = helpers.serial.dumps_many(items, self.snapshot_format)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(payload)
+        os.replace(temporary, path)
+        return len(items)
+
+    @staticmethod
+    def key(data: dict) -> str:
+        """Returns the cache key of a character, the URL name at the end of its URL."""
+        return data["url"].rstrip("/").rsplit("/", 1)[-1]
+
+    @staticmethod
+    def entry(data: dict) -> tuple:
+        """Returns the cache entry of a character: its data and its encoded body."""
+        return data, helpers.serial.dumps(data)
+
+    def lookup(self, name: str) -> tuple:
+        """
+        Returns the cache entry of a character, loading it from the wiki on a miss.
+
+        Parameters:
+        name (str): The name of the character, or its URL name.
+
+        Returns:
+        tuple: The data of the character and its encoded body.
+        """
+        name = name.replace("_", " ")
+
+        def load():
+            self.stats.count_load()
+            return self.entry(Character.fetch(name, self.client).get_data())
+
+        return self.cache.get_or_create(helpers.misc.format_name(name), load)
+
+
+class CharacterHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a CharacterServer."""
+
+    server_version = "mystic"
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        try:
+            status, body, headers = self.route(parts, parse_qs(url.query))
+        except helpers.exceptions.NotFoundError as error:
+            status, body, headers = 404, {"error": str(error)}, {}
+        except helpers.exceptions.CacheMissError as error:
+            # Like an only-if-cached request of HTTP caching: the page may exist, but cannot be fetched
+            status, body, headers = 504, {"error": str(error)}, {}
+        except helpers.exceptions.ThrottledError as error:
+            headers = {}
+            if error.retry_after is not None:
+                headers["Retry-After"] = str(int(error.retry_after))
+            status, body = 503, {"error": str(error)}
+        except helpers.exceptions.TransportError as error:
+            status, body, headers = 502, {"error": str(error)}, {}
+        except Exception as error:
+            status, body, headers = 500, {"error": repr(error)}, {}
+
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats.record(status, time.perf_counter() - started)
+
+    def route(self, parts: list, query: dict) -> tuple:
+        """
+        Answers a request.
+
+        Parameters:
+        parts (list[str]): The decoded segments of the path.
+        query (dict): The parsed query string.
+
+        Returns:
+        tuple: The status, the body (bytes, or data to encode as JSON) and the extra headers of the response.
+        """
+        if parts == ["health"]:
+            return 200, {"status": "ok"}, {}
+        if parts == ["stats"]:
+            stats = self.server.stats.snapshot()
+            stats["cache"] = self.server.cache.stats()
+            return 200, stats, {}
+        if len(parts) not in (2, 3) or parts[0] != "characters" or not parts[1]:
+            return 404, {"error": "Unknown endpoint."}, {}
+
+        data, body = self.server.lookup(parts[1])
+        fields = parts[2:] or ",".join(query.get("fields", [])).split(",")
+        fields = [field for field in fields if field]
+        if not fields:
+            return 200, body, {}
+
+        unknown = [field for field in fields if field not in data]
+        if unknown:
+            return 400, {"error": f"Unknown fields: {', '.join(unknown)}."}, {}
+        return 200, {field: data[field] for field in fields}, {}
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    client=None,
+    cache_size: int = 4096,
+    ttl: float = 3600,
+    snapshot: str = None,
+):
+    """
+    Runs a CharacterServer until interrupted, then saves its snapshot.
+
+    Parameters:
+    host (str): The host to listen on.
+    port (int): The port to listen on.
+    client (Client): The HTTP client to fetch the pages with. Defaults to the shared client.
+    cache_size (int): The maximum number of characters kept in memory.
+    ttl (float): The number of seconds a character stays cached. Forever if None.
+    snapshot (str): The path of the snapshot to preload on start and to save on exit.
+    """
+    server = CharacterServer((host, port), client, cache_size, ttl, snapshot)
+    print(f"Serving characters on http://{host}:{server.server_address[1]}/")
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Save the snapshot when stopped by a process manager too
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if snapshot is not None:
+            print(f"Saved {server.save_snapshot()} characters to {snapshot}")
@@ -0,0 +1,268 @@
+"""Persistent store of extracted characters, backed by SQLite."""
+
+import json
+import sqlite3
+import threading
+import time
+
+from mystic.helpers.misc import format_name
+
+# The fields whose values are indexed for lookups
+INDEXED_FIELDS = ("pathways", "affliation", "species", "authorities")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    url_name TEXT PRIMARY KEY,
+    name TEXT,
+    url TEXT,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL,
+    revid INTEGER,
+    revised TEXT
+);
+CREATE TABLE IF NOT EXISTS field_values (
+    url_name TEXT NOT NULL REFERENCES characters (url_name) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL COLLATE NOCASE
+);
+CREATE INDEX IF NOT EXISTS field_values_lookup ON field_values (field, value);
+CREATE INDEX IF NOT EXISTS field_values_owner ON field_values (url_name);
+"""
+
+# The columns added to the characters table since its first version
+MIGRATIONS = {"revid": "INTEGER", "revised": "TEXT"}
+
+
+class Store:
+    """
+    A local SQLite database of characters, with indexed lookups on list fields.
+
+    Characters are stored as the dict of Character.get_data(), keyed by their URL name.
+    """
+
+    def __init__(self, path: str = ":memory:", indexed_fields=INDEXED_FIELDS):
+        """
+        Initializes a Store object.
+
+        Parameters:
+        path (str): The path of the database file. Kept in memory by default.
+        indexed_fields (Iterable[str]): The fields whose values are indexed for by_field lookups.
+        """
+        self.path = path
+        self.indexed_fields = tuple(indexed_fields)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(characters)")
+        }
+        for column, kind in MIGRATIONS.items():
+            if column not in columns:
+                self._connection.execute(
+                    f"ALTER TABLE characters ADD COLUMN {column} {kind}"
+                )
+
+    @staticmethod
+    def key(data: dict) -> str:
+        """
+        Returns the key of a character, the URL name at the end of its URL.
+
+        Parameters:
+        data (dict): The data of the character.
+
+        Returns:
+        str: The URL name of the character.
+        """
+        return data["url"].rstrip("/").rsplit("/", 1)[-1]
+
+    def upsert(self, characters, revisions: dict = None) -> int:
+        """
+        Inserts or replaces many characters in a single transaction.
+
+        The revision of each page is recorded along its data, so that refresh can tell which pages changed since.
+        It is read from revisions, or else from the revision attribute of the character (set by fetch_batch and refresh).
+
+        Parameters:
+        characters (Iterable[Character | dict]): The characters, or the dicts of their get_data().
+        revisions (dict): The Page (or (revid, timestamp) pair) of the latest revision of each page, by URL name.
+
+        Returns:
+        int: The number of characters written.
+        """
+        now = time.time()
+        revisions = revisions or {}
+        rows = {}
+        values = {}
+        for character in characters:
+            data = character if isinstance(character, dict) else character.get_data()
+            url_name = self.key(data)
+            revision = revisions.get(url_name) or getattr(character, "revision", None)
+            # Both a Page and a (revid, timestamp) pair end with the revision ID and timestamp
+            revid, revised = revision[-2:] if revision else (None, None)
+            rows[url_name] = (
+                url_name,
+                data.get("name"),
+                data["url"],
+                json.dumps(data, ensure_ascii=False),
+                now,
+                revid,
+                revised,
+            )
+            values[url_name] = [
+                (url_name, field, str(item).strip())
+                for field in self.indexed_fields
+                for item in self._items(data.get(field))
+            ]
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM field_values WHERE url_name = ?",
+                [(url_name,) for url_name in rows],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO characters "
+                "(url_name, name, url, data, updated, revid, revised) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows.values(),
+            )
+            self._connection.executemany(
+                "INSERT INTO field_values VALUES (?, ?, ?)",
+                [value for items in values.values() for value in items],
+            )
+        return len(rows)
+
+    @staticmethod
+    def _items(value) -> list:
+        """Returns the non-empty items of a field, whether it holds a list or a single value."""
+        items = value if isinstance(value, (list, tuple)) else [value]
+        return [item for item in items if item is not None and str(item).strip()]
+
+    def _lookup(self, name: str) -> str:
+        """
+        Returns the stored key of a name: the URL name spelled as given if it is stored, else the one of format_name.
+
+        Keys are taken from the URLs of the pages, which format_name cannot always give back, e.g. Amon_(Character).
+        """
+        key = name.strip().replace(" ", "_")
+        row = self._connection.execute(
+            "SELECT url_name FROM characters WHERE url_name IN (?, ?) "
+            "ORDER BY url_name != ? LIMIT 1",
+            (key, format_name(name), key),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def get(self, name: str) -> dict:
+        """
+        Retrieves a stored character by name or by URL name.
+
+        Parameters:
+        name (str): The name of the character, or its key.
+
+        Returns:
+        dict: The data of the character, or None if it is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM characters WHERE url_name = ?", (self._lookup(name),)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def by_field(self, field: str, value: str) -> list[dict]:
+        """
+        Retrieves the characters having a value in an indexed field, ignoring case.
+
+        Parameters:
+        field (str): The indexed field, e.g. "pathways".
+        value (str): The value to look for, e.g. "Fool".
+
+        Returns:
+        list[dict]: The data of the matching characters, ordered by name.
+
+        Raises:
+        ValueError: If the field is not indexed.
+        """
+        if field not in self.indexed_fields:
+            raise ValueError(f"{field} is not an indexed field.")
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT characters.data, characters.name FROM field_values "
+                "JOIN characters USING (url_name) "
+                "WHERE field_values.field = ? AND field_values.value = ? "
+                "ORDER BY characters.name",
+                (field, value.strip()),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def by_pathway(self, pathway: str) -> list[dict]:
+        """Retrieves the characters of a pathway, e.g. "Fool"."""
+        return self.by_field("pathways", pathway)
+
+    def by_affiliation(self, affiliation: str) -> list[dict]:
+        """Retrieves the characters of an affiliation, e.g. "Tarot Club"."""
+        return self.by_field("affliation", affiliation)
+
+    def by_species(self, species: str) -> list[dict]:
+        """Retrieves the characters of a species, e.g. "Human"."""
+        return self.by_field("species", species)
+
+    def by_authority(self, authority: str) -> list[dict]:
+        """Retrieves the characters holding an authority, e.g. "Door"."""
+        return self.by_field("authorities", authority)
+
+    def revisions(self) -> dict:
+        """
+        Retrieves the recorded revision of every stored page.
+
+        Returns:
+        dict: The (revid, timestamp) pair of each stored page by URL name, (None, None) if it was not recorded.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT url_name, revid, revised FROM characters"
+            ).fetchall()
+        return {url_name: (revid, revised) for url_name, revid, revised in rows}
+
+    def delete(self, name: str) -> bool:
+        """
+        Removes a stored character by name or by URL name.
+
+        Parameters:
+        name (str): The name of the character, or its key.
+
+        Returns:
+        bool: Whether a character was removed.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM characters WHERE url_name = ?", (self._lookup(name),)
+            )
+        return cursor.rowcount > 0
+
+    def close(self):
+        """Closes the database."""
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM characters"
+            ).fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM characters ORDER BY name"
+            ).fetchall()
+        for row in rows:
+            yield json.loads(row[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,5 +1,245 @@
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import bs4
+import requests
+
+import mystic
 from mystic import Character
+from mystic.helpers.exceptions import (
+    CacheMissError,
+    NotFoundError,
+    ThrottledError,
+    TransportError,
+)
+
+STUB_PAGE = """<html><body><div class="mw-parser-output">
+<aside class="portable-infobox">
+<h2 class="pi-item pi-title">Fors Wall</h2>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Chinese</h3><div class="pi-data-value"><span>佛尔思·沃尔</span><span>Fors Wall</span></div></div>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Birth</h3><div class="pi-data-value">13 April 1326</div></div>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Gender</h3><div class="pi-data-value"><a href="/wiki/Female">Female</a></div></div>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Titles</h3><div class="pi-data-value">Angel of Stars<sup>[3]</sup></div></div>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Pathway(s)</h3><div class="pi-data-value"><a href="/wiki/Door" title="Door Pathway">Door</a><a href="#cite_note-1">[1]</a></div></div>
+<div class="pi-item pi-data"><h3 class="pi-data-label">Aliases</h3><div class="pi-data-value"><ul><li>The Magician</li><li>Margaret Taylor[2]</li></ul></div></div>
+</aside>
+<p>Fors Wall is a Beyonder.</p>
+</div></body></html>"""
+
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures"
+)
+FIXTURE_NAMES = ("Klein_Moretti", "Audrey_Hall", "Fors_Wall")
+
+STUB_REDIRECTS = {"Margaret Taylor": "Fors Wall"}
+STUB_REVISIONS = {
+    "Fors Wall": (7, 1001, "2026-01-01T00:00:00Z"),
+    "Fors Wall (Character)": (8, 2001, "2026-01-02T00:00:00Z"),
+}
+# Pages the API knows the wikitext of, without a rendered page
+STUB_WIKITEXT = {
+    "Fors Wall": """{{Character
+|name = Fors Wall
+|birth = 13 April 1326<ref>Volume 2</ref>
+|pathway = [[Door Pathway|Door]]
+}}
+Fors Wall is a Beyonder.""",
+    "Audrey Hall": """{{Character
+|name = Audrey Hall
+|pathway = [[Spectator Pathway|Spectator]]
+}}""",
+    "Tarot Club": """{{Organization
+|name = Tarot Club
+}}
+The Tarot Club is a secret organization.""",
+}
+STUB_API_PAGES = {
+    **STUB_REVISIONS,
+    "Audrey Hall": (8, 1002, "2026-01-02T00:00:00Z"),
+    "Tarot Club": (9, 1003, "2026-01-03T00:00:00Z"),
+}
+STUB_CHANGES = [
+    {"title": "Amon", "revid": 990, "timestamp": "2025-12-01T00:00:00Z"},
+    {"title": "Fors Wall", "revid": 1001, "timestamp": "2026-01-01T00:00:00Z"},
+]
+STUB_CATEGORY = {
+    "/wiki/Category:Characters": """<html><body>
+<a class="category-page__member-link" href="/wiki/Fors_Wall">Fors Wall</a>
+<a class="category-page__member-link" href="/wiki/Nobody_Here">Nobody Here</a>
+<a class="category-page__member-link" href="/wiki/Category:Deities">Category:Deities</a>
+<a class="category-page__pagination-next" href="/wiki/Category:Characters?from=N">Next</a>
+</body></html>""",
+    "/wiki/Category:Characters?from=N": """<html><body>
+<a class="category-page__member-link" href="/wiki/Fors_Wall">Fors Wall</a>
+</body></html>""",
+    "/wiki/Category:Deities": """<html><body>
+<a class="category-page__member-link" href="/wiki/Template:Deity">Template:Deity</a>
+</body></html>""",
+}
+
+
+class StubWikiHandler(BaseHTTPRequestHandler):
+    """
+    Serves STUB_PAGE for Fors Wall, STUB_CATEGORY, a minimal api.php and a 404 for every other page.
+
+    /wiki/Throttled always answers 429, /wiki/Closed answers 429 with a Retry-After of a day, and /wiki/Flaky answers 503 flaky_failures times before serving STUB_PAGE.
+    /wiki/Truncated cuts STUB_PAGE short truncated_failures times before serving it whole.
+    /wiki/Slow serves STUB_PAGE after a delay, counting its requests, and /wiki/Fors_Wall_(Character) serves it
+    under a name that format_name does not give back.
+    """
+
+    etag = '"stub-1"'
+    flaky_failures = 0
+    truncated_failures = 0
+    slow_requests = 0
+    # The headers of the latest request
+    last_headers = {}
+
+    def do_GET(self):
+        StubWikiHandler.last_headers = dict(self.headers)
+        url = urlsplit(self.path)
+        if url.path == "/api.php":
+            self.send_json(self.api(parse_qs(url.query)))
+            return
+
+        if self.path == "/wiki/Fors_Wall":
+            if self.headers.get("If-None-Match") == self.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = STUB_PAGE.encode()
+            self.send_response(200)
+            self.send_header("ETag", self.etag)
+        elif self.path in STUB_CATEGORY:
+            body = STUB_CATEGORY[self.path].encode()
+            self.send_response(200)
+        elif self.path == "/wiki/Throttled":
+            body = b"Too Many Requests"
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+        elif self.path == "/wiki/Closed":
+            body = b"Too Many Requests"
+            self.send_response(429)
+            self.send_header("Retry-After", "86400")
+        elif self.path == "/wiki/Slow":
+            StubWikiHandler.slow_requests += 1
+            time.sleep(0.2)
+            body = STUB_PAGE.encode()
+            self.send_response(200)
+        elif self.path == "/wiki/Fors_Wall_(Character)":
+            body = STUB_PAGE.encode()
+            self.send_response(200)
+        elif self.path == "/wiki/Truncated":
+            body = STUB_PAGE.encode()
+            self.send_response(200)
+            if StubWikiHandler.truncated_failures > 0:
+                StubWikiHandler.truncated_failures -= 1
+                # Announce the whole page, but send half of it and hang up
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body[: len(body) // 2])
+                self.close_connection = True
+                return
+        elif url.path == "/wiki/Flaky":
+            if StubWikiHandler.flaky_failures > 0:
+                StubWikiHandler.flaky_failures -= 1
+                body = b"Service Unavailable"
+                self.send_response(503)
+            else:
+                body = STUB_PAGE.encode()
+                self.send_response(200)
+        else:
+            body = b"Not Found"
+            self.send_response(404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def api(self, params):
+        if params.get("list") == ["recentchanges"]:
+            since = params["rcstart"][0]
+            changes = [
+                change for change in STUB_CHANGES if change["timestamp"] >= since
+            ]
+            return {"query": {"recentchanges": changes}}
+
+        titles = params["titles"][0].split("|")
+        content = "content" in params["rvprop"][0]
+        known = STUB_API_PAGES if content else STUB_REVISIONS
+        # With content, each answer holds the revision of one page, the others following as continuations
+        part = int(params.get("rvcontinue", ["0"])[0])
+        redirects, pages, existing = [], [], 0
+        for title in titles:
+            if title in STUB_REDIRECTS:
+                redirects.append({"from": title, "to": STUB_REDIRECTS[title]})
+                title = STUB_REDIRECTS[title]
+            if any(page["title"] == title for page in pages):
+                continue
+            if title not in known:
+                pages.append({"title": title, "missing": True})
+                continue
+
+            pageid, revid, timestamp = known[title]
+            page = {"pageid": pageid, "title": title}
+            if not content:
+                page["revisions"] = [{"revid": revid, "timestamp": timestamp}]
+            elif existing == part:
+                slots = {"main": {"content": STUB_WIKITEXT[title]}}
+                page["revisions"] = [
+                    {"revid": revid, "timestamp": timestamp, "slots": slots}
+                ]
+            pages.append(page)
+            existing += 1
+
+        answer = {"query": {"redirects": redirects, "pages": pages}}
+        if content and part + 1 < existing:
+            answer["continue"] = {"rvcontinue": str(part + 1), "continue": "||"}
+        return answer
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubWikiTestCase(unittest.TestCase):
+    """Runs a local stand-in of the wiki so that tests need no network."""
+
+    handler = StubWikiHandler
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), cls.handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/wiki/"
+        cls.client = mystic.Client(base_url=cls.base_url)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.close()
+        cls.server.shutdown()
+        cls.server.server_close()
 
 
 class TestCharacter(unittest.TestCase):
@@ -160,6 +400,1221 @@ class TestCharacter(unittest.TestCase):
         self.assertEqual(result, expected_result)
 
 
+class TestClient(StubWikiTestCase):
+    def record(self, client):
+        """Records the keyword arguments of every request sent through the session of a client."""
+        calls = []
+        send = client.session.get
+
+        def get(url, **kwargs):
+            calls.append(kwargs)
+            return send(url, **kwargs)
+
+        client.session.get = get
+        return calls
+
+    def test_session_is_shared(self):
+        client = mystic.Client(base_url=self.base_url)
+        calls = self.record(client)
+        previous = mystic.helpers.client._default_client
+        mystic.helpers.client.set_client(client)
+        try:
+            self.assertIs(mystic.helpers.client.get_client(), client)
+            Character("Fors Wall")
+            Character("Fors Wall")
+            mystic.fetch_batch(["Margaret Taylor"])
+        finally:
+            mystic.helpers.client.set_client(previous)
+            client.close()
+        # Two pages, then the API query and the page of fetch_batch, all through one session
+        self.assertEqual(len(calls), 4)
+
+    def test_timeouts(self):
+        client = mystic.Client(base_url=self.base_url, timeout=(1.5, 4.0))
+        calls = self.record(client)
+        with client:
+            Character("Fors Wall", client=client)
+            client.get(self.base_url + "Fors_Wall", timeout=9.0)
+        self.assertEqual(calls[0]["timeout"], (1.5, 4.0))
+        self.assertEqual(calls[1]["timeout"], 9.0)
+        with mystic.Client() as default:
+            self.assertEqual(default.timeout, mystic.helpers.client.DEFAULT_TIMEOUT)
+
+
+class TestAsync(StubWikiTestCase):
+    def test_afetch(self):
+        async def main():
+            async with mystic.AsyncClient(self.client) as client:
+                return await Character.afetch("Fors Wall", client)
+
+        character = asyncio.run(main())
+        self.assertEqual(character.name, "Fors Wall")
+        self.assertEqual(character.birth, "13 April 1326")
+        self.assertEqual(character.pathways, ["Door"])
+        self.assertEqual(character.url, self.base_url + "Fors_Wall")
+
+    def test_afetch_many(self):
+        async def main():
+            async with mystic.AsyncClient(self.client) as client:
+                return await mystic.afetch_many(
+                    ["Fors Wall", "Nobody Here", "Fors Wall"],
+                    concurrency=2,
+                    client=client,
+                    return_exceptions=True,
+                )
+
+        first, missing, second = asyncio.run(main())
+        self.assertEqual(first.aliases, ["The Magician", "Margaret Taylor"])
+        self.assertIsInstance(missing, NotFoundError)
+        self.assertEqual(second.name, "Fors Wall")
+
+
+class TestIterCharacters(StubWikiTestCase):
+    def test_iter_characters(self):
+        names = ["Fors Wall", "Nobody Here"] * 5
+        results = list(
+            mystic.iter_characters(
+                names,
+                workers=3,
+                max_in_flight=4,
+                client=self.client,
+                return_exceptions=True,
+            )
+        )
+
+        loaded = [result for result in results if isinstance(result, Character)]
+        failed = [result for result in results if isinstance(result, mystic.LoadError)]
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual({error.name for error in failed}, {"Nobody Here"})
+        self.assertTrue(all(isinstance(e.error, NotFoundError) for e in failed))
+
+    def test_iter_characters_raises(self):
+        with self.assertRaises(NotFoundError):
+            list(mystic.iter_characters(["Nobody Here"], client=self.client))
+
+
+class TestPageCache(StubWikiTestCase):
+    def test_revalidation_and_offline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = mystic.PageCache(directory)
+            client = mystic.Client(base_url=self.base_url, cache=cache)
+            url = self.base_url + "Fors_Wall"
+
+            first = client.get(url)
+            self.assertFalse(getattr(first, "from_cache", False))
+            self.assertEqual(cache.validators(url), {"If-None-Match": '"stub-1"'})
+
+            second = Character("Fors Wall", client)
+            self.assertTrue(second.response.from_cache)
+            self.assertEqual(second.birth, "13 April 1326")
+
+            offline = mystic.Client(base_url=self.base_url, cache=cache, offline=True)
+            self.assertEqual(Character("Fors Wall", offline).name, "Fors Wall")
+            with self.assertRaises(CacheMissError) as context:
+                Character("Klein Moretti", offline)
+            # A page missing from the cache is not known to be missing from the wiki
+            self.assertNotIsInstance(context.exception, NotFoundError)
+            client.close()
+            offline.close()
+
+    def test_offline_without_cache(self):
+        offline = mystic.Client(offline=True, retries=0)
+        with self.assertRaises(CacheMissError):
+            offline.get("http://127.0.0.1:9/x")
+        offline.close()
+
+    def test_refetch_keeps_headers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = mystic.PageCache(directory)
+            client = mystic.Client(base_url=self.base_url, cache=cache)
+            url = self.base_url + "Fors_Wall"
+            client.get(url)
+
+            # The server answers 304, but the cached body is gone
+            os.remove(cache.path(url) + ".body")
+            response = client.get(url, headers={"X-Caller": "tests"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(StubWikiHandler.last_headers.get("X-Caller"), "tests")
+            self.assertNotIn("If-None-Match", StubWikiHandler.last_headers)
+            client.close()
+
+
+class TestCharacterCache(StubWikiTestCase):
+    def setUp(self):
+        self.default_cache = Character.cache
+        Character.cache = mystic.helpers.memo.LRUCache(maxsize=2, ttl=60)
+
+    def tearDown(self):
+        Character.cache = self.default_cache
+
+    def test_cached(self):
+        first = Character.cached("Fors Wall", self.client)
+        second = Character.cached("fors  wall", self.client)
+        self.assertIs(first, second)
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(Character.cache.stats()["hits"], 1)
+        self.assertEqual(Character.cache.stats()["misses"], 1)
+
+        Character.invalidate("Fors Wall")
+        self.assertIsNot(Character.cached("Fors Wall", self.client), first)
+
+    def test_eviction_and_expiry(self):
+        cache = mystic.helpers.memo.LRUCache(maxsize=2, ttl=0)
+        cache.put("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+        cache.ttl = None
+        for key in "abc":
+            cache.put(key, key)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+
+class TestLazyFields(StubWikiTestCase):
+    def test_lazy_fields(self):
+        character = Character("Fors Wall", self.client)
+        self.assertEqual(character["pathways"], ["Door"])
+        self.assertIn("pathways", character.__dict__)
+        self.assertNotIn("birth", character.__dict__)
+
+        data = character.get_data()
+        self.assertEqual(list(data), ["url", "name", *Character.fields])
+        self.assertEqual(data["birth"], "13 April 1326")
+        self.assertEqual(character.get_data(), data)
+
+
+class TestParser(StubWikiTestCase):
+    # Paragraphs of site chrome, outside the article body, come before the intro on a live page
+    CHROME_PAGE = (
+        "<html><body>"
+        + "<p>Site navigation</p>" * 7
+        + '<div class="mw-parser-output">'
+        + "".join(f"<p>Paragraph {number}</p>" for number in range(1, 13))
+        + "</div></body></html>"
+    )
+
+    def test_strained_by_default(self):
+        character = Character("Fors Wall", self.client)
+        self.assertIsNone(character.parsed.find("body"))
+
+    def test_strained_tree_matches_full_tree(self):
+        strained = Character("Fors Wall", self.client)
+        Character.parse_only = None
+        try:
+            full = Character("Fors Wall", self.client)
+            # The fixtures hold paragraphs of site chrome before the article body
+            full_fixtures = [
+                TestFixtures.load(url_name).get_data() for url_name in FIXTURE_NAMES
+            ]
+        finally:
+            del Character.parse_only
+        self.assertIsNotNone(full.parsed.find("body"))
+        self.assertEqual(strained.get_data(), full.get_data())
+        self.assertEqual(
+            [TestFixtures.load(url_name).get_data() for url_name in FIXTURE_NAMES],
+            full_fixtures,
+        )
+
+    def test_intro_counts_article_paragraphs(self):
+        for parse_only in (None, mystic.objectStructures.CONTENT_STRAINER):
+            character = Character("Fors Wall", self.client)
+            character.parsed = bs4.BeautifulSoup(
+                self.CHROME_PAGE, "html.parser", parse_only=parse_only
+            )
+            self.assertEqual(
+                character.get_intro(),
+                [f"Paragraph {number}" for number in range(8, 13)],
+            )
+
+
+class TestFetchBatch(StubWikiTestCase):
+    def test_resolve(self):
+        api = mystic.helpers.api.WikiAPI(self.client)
+        self.assertEqual(api.api_url, self.base_url.replace("/wiki/", "/api.php"))
+        pages = api.resolve(["Fors Wall", "margaret taylor", "Nobody Here"])
+        self.assertEqual(pages["Fors Wall"].revid, 1001)
+        self.assertEqual(pages["margaret taylor"], pages["Fors Wall"])
+        self.assertIsNone(pages["Nobody Here"])
+
+    def test_fetch_batch(self):
+        first, redirected, missing = mystic.fetch_batch(
+            ["Fors Wall", "Margaret Taylor", "Nobody Here"],
+            batch_size=2,
+            client=self.client,
+            return_exceptions=True,
+        )
+        self.assertIs(first, redirected)
+        self.assertEqual(first.birth, "13 April 1326")
+        self.assertIsInstance(missing.error, NotFoundError)
+
+    def test_contents(self):
+        api = mystic.helpers.api.WikiAPI(self.client)
+        contents = api.contents(["Fors Wall", "Audrey Hall", "Margaret Taylor"])
+        page, text = contents["Audrey Hall"]
+        self.assertEqual(page.revid, 1002)
+        self.assertIn("Spectator Pathway", text)
+        self.assertEqual(contents["Margaret Taylor"], contents["Fors Wall"])
+
+    def test_fetch_batch_wikitext(self):
+        class CountingClient(mystic.Client):
+            requests = 0
+
+            def get(self, url, **kwargs):
+                CountingClient.requests += 1
+                return super().get(url, **kwargs)
+
+        client = CountingClient(base_url=self.base_url)
+        fors, audrey, redirected, missing = mystic.fetch_batch(
+            ["Fors Wall", "Audrey Hall", "Margaret Taylor", "Nobody Here"],
+            client=client,
+            return_exceptions=True,
+            source="wikitext",
+        )
+        # One query and its one continuation, and no page fetched
+        self.assertEqual(CountingClient.requests, 2)
+        self.assertIs(fors, redirected)
+        self.assertEqual(fors.birth, "13 April 1326")
+        self.assertEqual(fors.revision.revid, 1001)
+        self.assertEqual(audrey.pathways, ["Spectator"])
+        self.assertEqual(audrey.url, self.base_url + "Audrey_Hall")
+        self.assertIsInstance(missing.error, NotFoundError)
+
+        with self.assertRaises(ValueError):
+            mystic.fetch_batch(["Fors Wall"], client=client, source="xml")
+
+    def test_fetch_batch_wikitext_not_a_character(self):
+        (result,) = mystic.fetch_batch(
+            ["Tarot Club"],
+            client=self.client,
+            return_exceptions=True,
+            source="wikitext",
+        )
+        self.assertIsInstance(result, mystic.LoadError)
+        self.assertIsInstance(result.error, NotFoundError)
+        with self.assertRaises(NotFoundError):
+            mystic.fetch_batch(["Tarot Club"], client=self.client, source="wikitext")
+
+
+STUB_DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">
+<page><title>Fors Wall</title><ns>0</ns><id>7</id>
+<revision><id>1001</id><timestamp>2026-01-01T00:00:00Z</timestamp>
+<text xml:space="preserve">{{Character
+|name = Fors Wall
+|birth = 13 April 1326&lt;ref&gt;Volume 2&lt;/ref&gt;
+|pathway = [[Door Pathway|Door]]
+|aliases = *The Magician
+*Margaret Taylor
+}}
+'''Fors Wall''' is a Beyonder.
+</text></revision></page>
+<page><title>Tingen</title><ns>0</ns>
+<revision><id>1002</id><text>{{Location|name=Tingen}}</text></revision></page>
+<page><title>Template:Character</title><ns>10</ns>
+<revision><id>1003</id><text>{{Character}}</text></revision></page>
+</mediawiki>"""
+
+
+class TestDump(unittest.TestCase):
+    def test_iter_dump(self):
+        (data,) = mystic.iter_dump(io.BytesIO(STUB_DUMP.encode()))
+        self.assertEqual(list(data), ["url", "name", *Character.fields])
+        self.assertEqual(data["url"], mystic.helpers.client.WEB_URL + "Fors_Wall")
+        self.assertEqual(data["birth"], "13 April 1326")
+        self.assertEqual(data["pathways"], ["Door"])
+        self.assertEqual(data["aliases"], ["The Magician", "Margaret Taylor"])
+        self.assertEqual(data["intro"], ["Fors Wall is a Beyonder."])
+        self.assertIsNone(data["species"])
+
+    def test_extract_matches_rendered_page(self):
+        from mystic.objects import dump
+
+        text = """{{Character
+|name = Fors Wall
+|image = Fors Wall.png
+|chinese = 佛尔思·沃尔<br>Fors Wall
+|birth = 13 April 1326
+|gender = [[Female]]
+|titles = Angel of Stars<ref>Volume 8</ref>
+|pathway = [[Door Pathway|Door]]<ref>Volume 2</ref>
+|aliases = * The Magician
+* Margaret Taylor<ref>Volume 2</ref>
+}}"""
+        image = dump.file_url("Fors Wall.png")
+        self.assertEqual(image, dump.IMAGE_URL + "4/4c/Fors_Wall.png/revision/latest")
+        page = STUB_PAGE.replace(
+            "</h2>",
+            f'</h2>\n<figure class="pi-item pi-image"><a href="#"><img src="{image}"></a></figure>',
+        )
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        response._content = page.encode()
+        rendered = Character("Fors Wall", response=response).get_data()
+        extracted = dump.extract({"title": "Fors Wall", "text": text})
+        # The intro is read from the prose of the wikitext, not from paragraph positions
+        rendered.pop("intro")
+        extracted.pop("intro")
+        self.assertEqual(extracted, rendered)
+
+
+class TestStore(unittest.TestCase):
+    def test_store(self):
+        fors = {
+            "url": "https://lordofthemysteries.fandom.com/wiki/Fors_Wall",
+            "name": "Fors Wall",
+            "pathways": ["Door"],
+            "species": "Human",
+            "affliation": ["Tarot Club (Major Arcana)", "Abraham Family"],
+        }
+        klein = {
+            "url": "https://lordofthemysteries.fandom.com/wiki/Klein_Moretti",
+            "name": "Klein Moretti",
+            "pathways": ["Fool"],
+            "species": ["Mythical Creature ", "Human (Former)"],
+            "authorities": ["Fool", "Door", "Error"],
+        }
+
+        with mystic.Store() as store:
+            self.assertEqual(store.upsert([fors, klein, dict(fors)]), 2)
+            self.assertEqual(len(store), 2)
+            self.assertEqual(store.get("fors wall"), fors)
+            self.assertEqual(store.by_pathway("fool"), [klein])
+            self.assertEqual(store.by_authority("Door"), [klein])
+            self.assertEqual(store.by_species("Mythical Creature"), [klein])
+
+            store.upsert([{**fors, "pathways": ["Fool"]}])
+            self.assertEqual(
+                [data["name"] for data in store.by_pathway("Fool")],
+                ["Fors Wall", "Klein Moretti"],
+            )
+            self.assertEqual(store.by_pathway("Door"), [])
+
+            self.assertTrue(store.delete("Fors Wall"))
+            self.assertIsNone(store.get("Fors Wall"))
+            with self.assertRaises(ValueError):
+                store.by_field("gender", "Male")
+
+    def test_keys_not_given_back_by_format_name(self):
+        amon = {
+            "url": "https://lordofthemysteries.fandom.com/wiki/Amon_(Character)",
+            "name": "Amon",
+            "pathways": ("Error", "Apprentice"),
+        }
+        with mystic.Store() as store:
+            store.upsert([amon])
+            self.assertEqual(
+                store.get("Amon_(Character)"),
+                {**amon, "pathways": ["Error", "Apprentice"]},
+            )
+            self.assertEqual(store.get("Amon (Character)")["name"], "Amon")
+            self.assertEqual(
+                [data["name"] for data in store.by_pathway("Apprentice")], ["Amon"]
+            )
+            self.assertFalse(store.delete("Amon (character)"))
+            self.assertTrue(store.delete("Amon_(Character)"))
+            self.assertEqual(len(store), 0)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_search(self):
+        index = mystic.SearchIndex()
+        index.add(
+            {
+                "url": "https://lordofthemysteries.fandom.com/wiki/Klein_Moretti",
+                "name": "Klein Moretti",
+                "chinese_name": [("克莱恩·莫雷蒂", "Klein Moretti")],
+                "aliases": ["The Fool", "Mr. Clown", "Gehrman Sparrow"],
+                "intro": ["Klein Moretti was a Nighthawk in Tingen."],
+            }
+        )
+        index.add(
+            {
+                "url": "https://lordofthemysteries.fandom.com/wiki/Dunn_Smith",
+                "name": "Dunn Smith",
+                "intro": ["Dunn Smith was the captain of the Tingen Nighthawks."],
+            }
+        )
+
+        self.assertEqual(index.search("Mr. Clown")[0].name, "Klein Moretti")
+        self.assertEqual(index.search("克莱恩")[0].name, "Klein Moretti")
+        self.assertEqual(len(index.search("Tingen")), 2)
+        self.assertEqual(index.search("night", prefix=True)[0].name, "Dunn Smith")
+        self.assertEqual(index.search("night"), [])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = directory + "/index.json.gz"
+            index.save(path)
+            loaded = mystic.SearchIndex.load(path)
+        self.assertEqual(loaded.search("Tingen"), index.search("Tingen"))
+
+        self.assertTrue(loaded.remove("Dunn_Smith"))
+        self.assertEqual(
+            [hit.name for hit in loaded.search("Tingen")], ["Klein Moretti"]
+        )
+
+
+class TestRelationGraph(unittest.TestCase):
+    def test_graph(self):
+        graph = mystic.RelationGraph.from_characters(
+            [
+                {
+                    "name": "Klein Moretti",
+                    "relatives": ["Unnamed Father†", "Benson Moretti (Elder Brother)"],
+                    "masters": ["Azik Eggers", "Old Neil†"],
+                    "enemies": ["Amon"],
+                    "allies": None,
+                },
+                {
+                    "name": "Fors Wall",
+                    "relatives": ["Unnamed Father (Remarried)"],
+                    "masters": ["Dorian Gray Abraham"],
+                    "allies": "Xio Derecha",
+                },
+                {"name": "Azik Eggers", "enemies": ["Amon"]},
+            ]
+        )
+
+        self.assertIn("Benson Moretti", graph)
+        self.assertNotIn("Unnamed Father", graph)
+        self.assertEqual(
+            graph.shortest_path("Benson Moretti", "Azik Eggers"),
+            ["Benson Moretti", "Klein Moretti", "Azik Eggers"],
+        )
+        self.assertIsNone(graph.shortest_path("Klein Moretti", "Fors Wall"))
+        self.assertIsNone(
+            graph.shortest_path("Klein Moretti", "Amon", relations=["ally"])
+        )
+        self.assertEqual(
+            graph.neighbourhood("Amon", hops=2, relations=["enemy", "master"]),
+            {"Klein Moretti": 1, "Azik Eggers": 1, "Old Neil": 2},
+        )
+        self.assertEqual(len(graph.neighbourhood("Amon", hops=2)), 5)
+        self.assertEqual([len(component) for component in graph.components()], [6, 4])
+
+    def test_edges_are_not_repeated(self):
+        graph = mystic.RelationGraph()
+        graph.connect("Klein Moretti", "Amon", "enemy")
+        graph.connect("Amon", "Klein Moretti", "enemy")
+        graph.connect("Klein Moretti", "Amon", "master")
+        klein = graph.ids["Klein Moretti"]
+        self.assertEqual(
+            sorted(graph.neighbours(klein)),
+            [(graph.ids["Amon"], "enemy"), (graph.ids["Amon"], "master")],
+        )
+
+
+class TestCrawler(StubWikiTestCase):
+    def test_crawl(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = directory + "/crawl.json"
+            crawler = mystic.Crawler(checkpoint, client=self.client, workers=2)
+            results = list(crawler.crawl())
+
+            names = sorted(result.name for result in results)
+            self.assertEqual(names, ["Fors Wall", "Nobody_Here"])
+            errors = [
+                result for result in results if isinstance(result, mystic.LoadError)
+            ]
+            self.assertIsInstance(errors[0].error, NotFoundError)
+            self.assertIn("Category:Deities", crawler.visited_categories)
+            self.assertIn("Category:Characters?from=N", crawler.visited_categories)
+
+            with open(checkpoint, encoding="utf-8") as file:
+                state = json.load(file)
+            self.assertEqual(state["done"], ["Fors_Wall"])
+            self.assertEqual(list(state["failed"]), ["Nobody_Here"])
+            self.assertEqual(state["frontier"], [])
+
+            resumed = mystic.Crawler(checkpoint, client=self.client)
+            self.assertEqual(list(resumed.crawl()), [])
+
+    def test_interrupted_crawl_resumes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = directory + "/crawl.json"
+            crawler = mystic.Crawler(checkpoint, client=self.client, workers=1)
+            crawl = crawler.crawl()
+            next(crawl)
+            crawl.close()
+
+            resumed = mystic.Crawler(checkpoint, client=self.client, workers=1)
+            first = crawler.done | set(crawler.failed)
+            rest = {
+                (
+                    result.url.rsplit("/", 1)[-1]
+                    if isinstance(result, Character)
+                    else result.name
+                )
+                for result in resumed.crawl()
+            }
+            self.assertEqual(first | rest, {"Fors_Wall", "Nobody_Here"})
+
+    def test_load_page_by_exact_name(self):
+        crawler = mystic.Crawler(client=self.client)
+        character = crawler.load_page("Fors_Wall_(Character)")
+        self.assertEqual(character.url, self.base_url + "Fors_Wall_(Character)")
+        self.assertEqual(character.get_data()["url"], character.url)
+        # Without quoting, the "#" would end the path and /wiki/Fors_Wall be loaded
+        with self.assertRaises(NotFoundError):
+            crawler.load_page("Fors_Wall#1")
+
+    def test_interrupted_category_is_kept(self):
+        class Unreachable(mystic.Client):
+            def get(self, url, **kwargs):
+                raise TransportError("The wiki cannot be reached.")
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = directory + "/crawl.json"
+            client = Unreachable(base_url=self.base_url)
+            with self.assertRaises(TransportError):
+                list(mystic.Crawler(checkpoint, client=client).crawl())
+            with open(checkpoint, encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["categories"], ["Category:Characters"])
+
+            resumed = mystic.Crawler(checkpoint, client=self.client)
+            names = sorted(result.name for result in resumed.crawl())
+            self.assertEqual(names, ["Fors Wall", "Nobody_Here"])
+
+    def test_failed_pages_are_retried(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = directory + "/crawl.json"
+            state = {
+                "categories": [],
+                "visited_categories": ["Category:Characters"],
+                "frontier": [],
+                "done": [],
+                "failed": {
+                    "Fors_Wall": "TransportError('Timed out.')",
+                    "Nobody_Here": "NotFoundError('Character not found.')",
+                },
+                "missing": ["Nobody_Here"],
+            }
+            with open(checkpoint, "w", encoding="utf-8") as file:
+                json.dump(state, file)
+
+            kept = mystic.Crawler(checkpoint, client=self.client, retry_failed=False)
+            self.assertEqual(list(kept.crawl()), [])
+
+            resumed = mystic.Crawler(checkpoint, client=self.client)
+            self.assertEqual([result.name for result in resumed.crawl()], ["Fors Wall"])
+            self.assertEqual(resumed.done, {"Fors_Wall"})
+            self.assertEqual(list(resumed.failed), ["Nobody_Here"])
+
+
+class TestRetries(StubWikiTestCase):
+    def test_retries_server_errors(self):
+        StubWikiHandler.flaky_failures = 2
+        client = mystic.Client(base_url=self.base_url, retries=2, backoff=0)
+        self.assertEqual(Character("Flaky", client=client).name, "Fors Wall")
+
+    def test_retries_truncated_pages(self):
+        StubWikiHandler.truncated_failures = 1
+        client = mystic.Client(base_url=self.base_url, retries=1, backoff=0)
+        self.assertEqual(Character("Truncated", client=client).name, "Fors Wall")
+
+        StubWikiHandler.truncated_failures = 2
+        with self.assertRaises(TransportError):
+            Character("Truncated", client=client)
+
+    def test_gives_up_on_server_errors(self):
+        StubWikiHandler.flaky_failures = 2
+        client = mystic.Client(base_url=self.base_url, retries=1, backoff=0)
+        with self.assertRaises(TransportError) as context:
+            Character("Flaky", client=client)
+        self.assertEqual(context.exception.status_code, 503)
+        self.assertNotIsInstance(context.exception, NotFoundError)
+
+    def test_throttled(self):
+        limiter = mystic.RateLimiter(rate=100, burst=5)
+        client = mystic.Client(base_url=self.base_url, rate_limiter=limiter, retries=1)
+        with self.assertRaises(ThrottledError) as context:
+            Character("Throttled", client=client)
+        self.assertEqual(context.exception.retry_after, 0)
+
+        with self.assertRaises(NotFoundError):
+            Character("Nobody Here", client=client)
+
+    def test_caps_retry_after(self):
+        limiter = mystic.RateLimiter(rate=100, burst=5)
+        client = mystic.Client(base_url=self.base_url, rate_limiter=limiter)
+        start = time.monotonic()
+        with self.assertRaises(ThrottledError) as context:
+            Character("Closed", client=client)
+        self.assertEqual(context.exception.retry_after, 86400)
+        self.assertLess(time.monotonic() - start, 1)
+        # The limiter was not paused for a day either
+        self.assertEqual(Character("Fors Wall", client=client).name, "Fors Wall")
+
+    def test_api_errors(self):
+        api = mystic.helpers.api.WikiAPI(
+            self.client, api_url=self.base_url + "Nobody_Here"
+        )
+        with self.assertRaises(NotFoundError):
+            api.resolve(["Fors Wall"])
+
+        StubWikiHandler.flaky_failures = 1
+        client = mystic.Client(base_url=self.base_url, retries=0)
+        api = mystic.helpers.api.WikiAPI(client, api_url=self.base_url + "Flaky")
+        with self.assertRaises(TransportError) as context:
+            api.resolve(["Fors Wall"])
+        self.assertEqual(context.exception.status_code, 503)
+
+    def test_rate_limiter(self):
+        limiter = mystic.RateLimiter(rate=50, burst=2)
+        start = time.monotonic()
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(7)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Two tokens are available at once, the five others come at 50 per second
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+class TestSingleFlight(StubWikiTestCase):
+    def setUp(self):
+        StubWikiHandler.slow_requests = 0
+
+    def test_threads_share_one_fetch(self):
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [
+                executor.submit(Character.fetch, "Slow", self.client) for _ in range(5)
+            ]
+            characters = [future.result() for future in futures]
+        self.assertEqual(StubWikiHandler.slow_requests, 1)
+        self.assertTrue(all(character is characters[0] for character in characters))
+
+        # Nothing is kept once the fetch is done
+        Character.fetch("Slow", self.client)
+        self.assertEqual(StubWikiHandler.slow_requests, 2)
+
+    def test_tasks_share_one_fetch(self):
+        async def fetch():
+            async with mystic.AsyncClient(self.client) as client:
+                return await asyncio.gather(
+                    *(Character.afetch("Slow", client) for _ in range(5))
+                )
+
+        characters = asyncio.run(fetch())
+        self.assertEqual(StubWikiHandler.slow_requests, 1)
+        self.assertTrue(all(character is characters[0] for character in characters))
+
+    def test_errors_are_shared(self):
+        flights = mystic.helpers.memo.SingleFlight()
+        started = threading.Event()
+        calls = []
+
+        def fail():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            raise NotFoundError("Character not found.")
+
+        def call():
+            with self.assertRaises(NotFoundError):
+                flights.do("key", fail)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=call) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader, *followers]:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flights.shared, 3)
+
+
+class TestFixtures(unittest.TestCase):
+    """Extracts the saved pages the benchmarks run on, without any network access."""
+
+    @staticmethod
+    def load(url_name):
+        response = requests.Response()
+        response.status_code = 200
+        response.encoding = "utf-8"
+        path = os.path.join(FIXTURES, url_name + ".html")
+        with open(path, "rb") as file:
+            response._content = file.read()
+        return Character(url_name.replace("_", " "), response=response)
+
+    def test_klein_moretti(self):
+        character = self.load("Klein_Moretti")
+        self.assertEqual(character.name, "Klein Moretti")
+        self.assertEqual(character.chinese_name, [("克莱恩·莫雷蒂", "Klein Moretti")])
+        self.assertEqual(character.pathways, ["Fool"])
+        self.assertIn("Gehrman Sparrow", character.aliases)
+        self.assertIn("Audrey Hall", character.allies)
+
+    def test_fors_wall(self):
+        character = self.load("Fors_Wall")
+        self.assertEqual(character.birth, "13 April 1326")
+        self.assertEqual(character.gender, "Female")
+        self.assertEqual(character.pathways, ["Door"])
+        self.assertEqual(character.residence, ["Backlund", "Sefirah Castle"])
+        # The single-value boxes of the live page, as recorded by TestCharacter.test2
+        self.assertEqual(character.species, "Human")
+        self.assertEqual(character.height, "1.65 meters")
+        self.assertEqual(character.eye_colour, "Light Blue")
+        self.assertEqual(character.hair_colour, "Brown")
+        self.assertEqual(character.titles, "Angel of Stars")
+        self.assertEqual(
+            character.enemies,
+            ["Traitors of Abraham FamilyBotis†Mr.X†", "Botis†", "Mr.X†"],
+        )
+        self.assertIsNone(character.allies)
+
+    def test_encodes_every_fixture(self):
+        for url_name in FIXTURE_NAMES:
+            character = self.load(url_name)
+            data = json.loads(character.to_json())
+            self.assertEqual(data, json.loads(json.dumps(character.get_data())))
+            self.assertEqual(character.to_record().get_data(), character.get_data())
+
+
+class TestTracing(StubWikiTestCase):
+    def test_disabled(self):
+        character = Character("Fors Wall", client=self.client)
+        self.assertIsNone(character.trace)
+        self.assertNotIn("trace", character.get_data())
+
+    def test_trace(self):
+        Character.tracing = True
+        try:
+            character = Character("Fors Wall", client=self.client)
+        finally:
+            Character.tracing = False
+
+        trace = character.trace
+        self.assertEqual(
+            list(trace.timings), ["format", "fetch", "parse", "infobox", "name"]
+        )
+        self.assertEqual(trace.page_bytes, len(STUB_PAGE.encode()))
+        self.assertEqual(trace.wire_bytes, len(STUB_PAGE.encode()))
+        self.assertFalse(trace.from_cache)
+        self.assertIsNotNone(trace.server_seconds)
+
+        character.titles
+        self.assertIn("titles", trace.timings)
+        character.load_fields()
+        self.assertEqual(len(trace.timings), 5 + len(Character.fields))
+        self.assertNotIn("trace", character.get_data())
+
+    def test_cache_hit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            client = mystic.Client(
+                base_url=self.base_url, cache=mystic.PageCache(directory)
+            )
+            Character.tracing = True
+            try:
+                first = Character("Fors Wall", client=client)
+                second = Character("Fors Wall", client=client)
+            finally:
+                Character.tracing = False
+        self.assertFalse(first.trace.from_cache)
+        self.assertTrue(second.trace.from_cache)
+        self.assertEqual(second.trace.wire_bytes, 0)
+        self.assertEqual(second.trace.page_bytes, first.trace.page_bytes)
+
+    def test_hooks(self):
+        stages = []
+
+        @Character.add_hook
+        def hook(character, stage, seconds):
+            stages.append((character.url_name, stage))
+            self.assertGreaterEqual(seconds, 0)
+
+        try:
+            character = Character("Fors Wall", client=self.client)
+            character.pathways
+        finally:
+            Character.remove_hook(hook)
+
+        self.assertEqual(
+            [stage for _, stage in stages],
+            ["format", "fetch", "parse", "infobox", "name", "pathways"],
+        )
+        self.assertIsNone(Character("Fors Wall", client=self.client).trace)
+
+    def test_hook_removing_itself(self):
+        stages = []
+
+        def once(character, stage, seconds):
+            Character.remove_hook(once)
+
+        def hook(character, stage, seconds):
+            stages.append(stage)
+
+        Character.add_hook(once)
+        Character.add_hook(hook)
+        try:
+            Character("Fors Wall", client=self.client)
+        finally:
+            Character.remove_hook(hook)
+        # The hook after the one that removed itself still sees the first stage
+        self.assertEqual(stages, ["format", "fetch", "parse", "infobox", "name"])
+
+
+class TestCharacterRecord(StubWikiTestCase):
+    def test_record(self):
+        character = Character("Fors Wall", client=self.client)
+        record = character.to_record()
+
+        self.assertEqual(record.name, "Fors Wall")
+        self.assertEqual(record.aliases, ("The Magician", "Margaret Taylor"))
+        self.assertEqual(record.chinese_name, (("佛尔思·沃尔", "Fors Wall"),))
+        self.assertEqual(record.get_data(), character.get_data())
+        self.assertFalse(hasattr(record, "__dict__"))
+
+        with self.assertRaises(AttributeError):
+            record.name = "Audrey Hall"
+        self.assertEqual(record, mystic.CharacterRecord.from_data(record.get_data()))
+        self.assertEqual(len({record, character.to_record()}), 1)
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        self.assertEqual(record.replace(name="Fors").name, "Fors")
+
+    def test_consumers(self):
+        record = Character("Fors Wall", client=self.client).to_record()
+        with mystic.Store() as store:
+            store.upsert([record])
+            stored = store.get("Fors Wall")
+            self.assertEqual(mystic.CharacterRecord.from_data(stored), record)
+        index = mystic.SearchIndex()
+        index.add(record)
+        self.assertEqual(index.search("magician")[0].name, "Fors Wall")
+
+
+class TestLowMemory(StubWikiTestCase):
+    def test_low_memory(self):
+        expected = Character("Fors Wall", client=self.client).get_data()
+        Character.low_memory = True
+        try:
+            character = Character("Fors Wall", client=self.client)
+        finally:
+            Character.low_memory = False
+
+        self.assertIsNone(character.response)
+        self.assertIsNone(character.parsed)
+        self.assertIsNone(character.infobox)
+        self.assertEqual(character.pathways, ["Door"])
+        self.assertEqual(character.get_data(), expected)
+
+    def test_release(self):
+        character = Character("Fors Wall", client=self.client)
+        expected = character.get_data()
+        character.release()
+        self.assertIsNone(character.parsed)
+        self.assertEqual(character.get_data(), expected)
+
+
+class TestSerialization(StubWikiTestCase):
+    def setUp(self):
+        self.character = Character("Fors Wall", client=self.client)
+
+    def test_from_dict(self):
+        character = Character.from_dict(self.character.get_data())
+        self.assertIsNone(character.parsed)
+        self.assertEqual(character.url_name, "Fors_Wall")
+        self.assertEqual(str(character), "Fors Wall")
+        self.assertEqual(character.get_data(), self.character.get_data())
+
+    def test_json(self):
+        character = Character.from_bytes(self.character.to_json())
+        self.assertEqual(character.chinese_name, [("佛尔思·沃尔", "Fors Wall")])
+        self.assertEqual(character.get_data(), self.character.get_data())
+
+    @unittest.skipUnless(importlib.util.find_spec("msgpack"), "requires msgpack")
+    def test_msgpack(self):
+        character = Character.from_bytes(self.character.to_msgpack(), "msgpack")
+        self.assertEqual(character.get_data(), self.character.get_data())
+
+    def test_many(self):
+        items = [self.character, self.character.to_record(), {"url": "/wiki/Amon"}]
+        formats = ["json"]
+        if importlib.util.find_spec("msgpack"):
+            formats.append("msgpack")
+        for format in formats:
+            payload = mystic.encode_many(items, format)
+            characters = list(mystic.decode_many(payload, format))
+            self.assertEqual(len(characters), 3)
+            self.assertEqual(characters[1].get_data(), self.character.get_data())
+            self.assertEqual(characters[2].url_name, "Amon")
+            self.assertIsNone(characters[2].pathways)
+
+        with self.assertRaises(ValueError):
+            self.character.to_bytes("xml")
+
+    def test_titles_without_list(self):
+        # The live Fors Wall page holds a single title, without <li> items
+        self.assertEqual(self.character.titles, "Angel of Stars")
+        self.assertEqual(
+            json.loads(self.character.to_json())["titles"], "Angel of Stars"
+        )
+        self.assertEqual(self.character.to_record().titles, "Angel of Stars")
+        with mystic.Store() as store:
+            store.upsert([self.character])
+            self.assertEqual(store.get("Fors Wall")["titles"], "Angel of Stars")
+
+
+class TestRefresh(StubWikiTestCase):
+    def store(self, revid):
+        store = mystic.Store()
+        character = Character("Fors Wall", client=self.client)
+        gone = {"url": self.base_url + "Nobody_Here", "name": "Nobody Here"}
+        store.upsert([character, gone], {"Fors_Wall": (revid, None)})
+        return store
+
+    def test_records_revisions(self):
+        with mystic.Store() as store:
+            store.upsert(mystic.fetch_batch(["Margaret Taylor"], client=self.client))
+            self.assertEqual(
+                store.revisions(), {"Fors_Wall": (1001, "2026-01-01T00:00:00Z")}
+            )
+
+    def test_refresh(self):
+        with self.store(1000) as store:
+            result = mystic.refresh(store, client=self.client, remove_missing=True)
+            self.assertEqual(result.checked, 2)
+            self.assertEqual(result.changed, ["Fors_Wall"])
+            self.assertEqual(result.updated, 1)
+            self.assertEqual(result.removed, ["Nobody_Here"])
+            self.assertEqual(result.failed, [])
+            self.assertEqual(
+                store.revisions(), {"Fors_Wall": (1001, "2026-01-01T00:00:00Z")}
+            )
+
+            again = mystic.refresh(store, client=self.client)
+            self.assertEqual((again.changed, again.updated), ([], 0))
+
+    def test_recent_changes(self):
+        api = mystic.helpers.api.WikiAPI(self.client)
+        self.assertEqual(
+            api.recent_changes("2025-12-15T00:00:00Z"), {"Fors Wall": 1001}
+        )
+
+        with self.store(1000) as store:
+            result = mystic.refresh(
+                store, client=self.client, since="2026-06-01T00:00:00Z"
+            )
+            # Only the page without a recorded revision is checked
+            self.assertEqual((result.checked, result.changed), (1, []))
+
+            result = mystic.refresh(
+                store, client=self.client, since="2025-12-15T00:00:00Z"
+            )
+            self.assertEqual((result.checked, result.changed), (2, ["Fors_Wall"]))
+
+    def test_key_not_given_back_by_format_name(self):
+        key = "Fors_Wall_(Character)"
+        self.assertNotEqual(mystic.helpers.misc.format_name(key), key)
+        with mystic.Store() as store:
+            store.upsert([{"url": self.base_url + key, "name": "Fors Wall"}])
+            result = mystic.refresh(store, client=self.client)
+            self.assertEqual((result.changed, result.updated), ([key], 1))
+            self.assertEqual(result.failed, [])
+            self.assertEqual(store.revisions(), {key: (2001, "2026-01-02T00:00:00Z")})
+            self.assertEqual(next(iter(store))["pathways"], ["Door"])
+
+
+class TestServer(StubWikiTestCase):
+    def setUp(self):
+        from mystic.objects.server import CharacterServer
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.directory.name, "characters.jsonl")
+        self.service = CharacterServer(
+            ("127.0.0.1", 0), self.client, snapshot=self.snapshot
+        )
+        threading.Thread(target=self.service.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.service.server_port}"
+
+    def tearDown(self):
+        self.service.shutdown()
+        self.service.server_close()
+        self.directory.cleanup()
+
+    def test_character(self):
+        response = requests.get(f"{self.url}/characters/Fors%20Wall")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["name"], "Fors Wall")
+
+        response = requests.get(f"{self.url}/characters/Fors_Wall?fields=name,pathways")
+        self.assertEqual(response.json(), {"name": "Fors Wall", "pathways": ["Door"]})
+        response = requests.get(f"{self.url}/characters/Fors%20Wall/pathways")
+        self.assertEqual(response.json(), {"pathways": ["Door"]})
+
+        stats = requests.get(f"{self.url}/stats").json()
+        self.assertEqual(stats["loads"], 1)
+        self.assertEqual(stats["statuses"], {"200": 3})
+        self.assertEqual(stats["cache"]["hits"], 2)
+
+    def test_errors(self):
+        response = requests.get(f"{self.url}/characters/Nobody%20Here")
+        self.assertEqual(response.status_code, 404)
+        response = requests.get(f"{self.url}/characters/Fors%20Wall/weight")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(requests.get(f"{self.url}/nothing").status_code, 404)
+        self.assertEqual(requests.get(f"{self.url}/health").json(), {"status": "ok"})
+
+    def test_cache_miss(self):
+        from mystic.objects.server import CharacterServer
+
+        cache = mystic.PageCache(self.directory.name)
+        offline = mystic.Client(base_url=self.base_url, cache=cache, offline=True)
+        service = CharacterServer(("127.0.0.1", 0), offline)
+        threading.Thread(target=service.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{service.server_port}/characters/Fors%20Wall"
+            self.assertEqual(requests.get(url).status_code, 504)
+        finally:
+            service.shutdown()
+            service.server_close()
+            offline.close()
+
+    def test_snapshot(self):
+        from mystic.objects.server import CharacterServer
+
+        requests.get(f"{self.url}/characters/Fors%20Wall")
+        self.assertEqual(self.service.save_snapshot(), 1)
+
+        warm = CharacterServer(("127.0.0.1", 0), self.client, snapshot=self.snapshot)
+        try:
+            data, _ = warm.lookup("Fors Wall")
+            self.assertEqual(data["name"], "Fors Wall")
+            self.assertEqual(warm.stats.loads, 0)
+        finally:
+            warm.server_close()
+
+
+class TestExport(StubWikiTestCase):
+    def test_jsonl(self):
+        from mystic.objects.export import export
+
+        output, failures, progress = io.StringIO(), io.StringIO(), io.StringIO()
+        result = export(
+            ["Fors Wall", "Nobody Here"],
+            output,
+            client=self.client,
+            failures=failures,
+            progress=progress,
+        )
+        self.assertEqual(result.written, 1)
+        self.assertEqual([error.name for error in result.failed], ["Nobody Here"])
+        self.assertEqual(json.loads(output.getvalue())["name"], "Fors Wall")
+        self.assertEqual(failures.getvalue(), "Nobody Here\tnot found\n")
+        self.assertIn("1 written, 1 failed", progress.getvalue())
+
+    def test_record_errors(self):
+        from mystic.objects.export import export
+
+        dumps = mystic.helpers.serial.dumps
+        calls = []
+
+        def failing(data, format="json"):
+            calls.append(data["name"])
+            if len(calls) == 1:
+                raise TypeError("Object of type Tag is not JSON serializable")
+            return dumps(data, format)
+
+        output, failures = io.StringIO(), io.StringIO()
+        mystic.helpers.serial.dumps = failing
+        try:
+            result = export(
+                ["fors wall", "Fors Wall"],
+                output,
+                workers=1,
+                client=self.client,
+                failures=failures,
+            )
+        finally:
+            mystic.helpers.serial.dumps = dumps
+        self.assertEqual(result.written, 1)
+        self.assertEqual(len(result.failed), 1)
+        self.assertEqual(len(output.getvalue().splitlines()), 1)
+        # The failure is reported under the name it was asked by, not the one of the page
+        self.assertEqual(result.failed[0].name, "fors wall")
+        self.assertTrue(failures.getvalue().startswith("fors wall\tTypeError("))
+
+    def test_csv(self):
+        import csv
+
+        from mystic.objects.export import export
+        from mystic.objects.record import RECORD_FIELDS
+
+        output = io.StringIO()
+        export(["Fors Wall"], output, format="csv", client=self.client)
+        output.seek(0)
+        reader = csv.DictReader(output)
+        self.assertEqual(tuple(reader.fieldnames), RECORD_FIELDS)
+        row = next(reader)
+        self.assertEqual(row["name"], "Fors Wall")
+        self.assertEqual(json.loads(row["pathways"]), ["Door"])
+
+    def test_command(self):
+        from mystic.__main__ import main
+
+        with tempfile.TemporaryDirectory() as directory:
+            names = os.path.join(directory, "names.txt")
+            output = os.path.join(directory, "characters.jsonl")
+            failures = os.path.join(directory, "failures.tsv")
+            with open(names, "w") as file:
+                file.write("# Tarot Club\nFors Wall\n\nNobody Here\n")
+
+            status = main(
+                ["export", "--names", names, "--output", output]
+                + ["--failures", failures, "--base-url", self.base_url, "--quiet"]
+            )
+            self.assertEqual(status, 1)
+            with open(output) as file:
+                self.assertEqual(
+                    [json.loads(line)["name"] for line in file], ["Fors Wall"]
+                )
+            with open(failures) as file:
+                self.assertEqual(file.read(), "Nobody Here\tnot found\n")
+
+
+class TestFormatName(unittest.TestCase):
+    def setUp(self):
+        self.format_name = mystic.helpers.misc.format_name
+
+    def test_first_word(self):
+        self.assertEqual(self.format_name("the fool"), "The_Fool")
+        self.assertEqual(self.format_name("klein moretti"), "Klein_Moretti")
+
+    def test_minor_words(self):
+        self.assertEqual(
+            self.format_name("lord of the mysteries"), "Lord_of_the_Mysteries"
+        )
+        self.assertEqual(self.format_name("Angel Of Stars"), "Angel_of_Stars")
+
+    def test_single_letters(self):
+        self.assertEqual(self.format_name("Mr. A"), "Mr._A")
+        self.assertEqual(self.format_name("mr. a"), "Mr._A")
+
+    def test_memoized(self):
+        self.format_name.cache_clear()
+        self.format_name("Fors Wall")
+        self.format_name("Fors Wall")
+        self.assertEqual(self.format_name.cache_info().hits, 1)
+
+
+class TestImports(unittest.TestCase):
+    def test_import_is_cheap(self):
+        code = (
+            "import sys, mystic; from mystic import Character; "
+            "print(sorted({'bs4', 'requests', 'asyncio'} & set(sys.modules)))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
 # More tests...
 
 if __name__ == "__main__":